@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+
+class EquityCache:
+    """
+    Size capped LRU cache of the winning probabilities. When it is full, the least recently used value is evicted.
+    Counts hits, misses and evictions
+    """
+
+    def __init__(self, maxsize=100000):
+        """
+        :param maxsize: maximal number of values stored
+        """
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        :return: the value stored by the key (and marks it as recently used), None if there is no such value
+        """
+        value = self._values.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._values.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """Stores the value, evicting the least recently used values if the cache is full"""
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Removes all the values and resets the counters"""
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def stats(self) -> dict:
+        """
+        :return: counters and the current size of the cache
+        """
+        return {
+            "size": len(self._values),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __str__(self):
+        return str(self.stats())
@@ -66,6 +66,8 @@ class MCCFPlayer(PlayerBase):
     node_order = []
     player_id_order = []
     nodes = {}
+    # estimate the probability of winning with adaptive_winning_prob() instead of 400 games
+    adaptive_prob = False
 
     def __init__(self, is_learning=False, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -85,6 +87,10 @@ class MCCFPlayer(PlayerBase):
 
         super().update_game_info(*args, **kwargs)
 
+    def needs_broadcast(self):
+        """The information set only depends on the state at the moment of the action"""
+        return False
+
     def game_over(self, gained):
         """
         Game is over. Do CFR calculations
@@ -110,6 +116,19 @@ class MCCFPlayer(PlayerBase):
         """Quantize the probability of winning based on the num value"""
         return round(prob * (num - 1))
 
+    def _probability_boundaries(self, num=10):
+        """Boundaries between the values of the probability of winning quantized into num values"""
+        return [(k + 0.5) / (num - 1) for k in range(num - 1)]
+
+    def _winning_prob_estimate(self):
+        """
+        Probability of winning for the information set. If adaptive_prob is set, the sampling stops as soon as
+        the quantized probability is clear
+        """
+        if MCCFPlayer.adaptive_prob:
+            return self.adaptive_winning_prob(400, boundaries=self._probability_boundaries())[0]
+        return self.winning_prob(400)
+
     def _quantized_player_to_money(self, val):
         """Quantized val (action) to the money to bet relatively to player's money"""
         return round(val / (self.actions_raise_num - 1) * self.player_profile.money)
@@ -130,7 +149,7 @@ class MCCFPlayer(PlayerBase):
             self.game_info.round_idx,
             self._quantize_total_money(self.game_info.current_bet),
             # self._quantize_money(self.player_profile.money),
-            self._quantize_probability(self.winning_prob(400))
+            self._quantize_probability(self._winning_prob_estimate())
         )
 
     def action(self):
@@ -1,15 +1,58 @@
-from copy import deepcopy
 from poker.environment.Game import GameInfo
 from poker.Players.PlayerProfile import PlayerProfile
 from poker.environment.Card import Card
-from random import sample
-from poker.environment.Card import CombinationFinder
+from random import getrandbits
+from itertools import combinations
+from math import comb, sqrt
+from bisect import bisect
+import numpy as np
+from poker.environment.HandEvaluator import HandEvaluator
+from poker.environment.SuitIsomorphism import SuitIsomorphism
+from poker.Players.EquityCache import EquityCache
+from poker.Players.PreflopEquity import PreflopEquity
 
 
 class PlayerBase:
     """
     Base for different subclasses of players with its own agents and behaviors
     """
+    # winning_prob() enumerates all the outcomes instead of sampling if there are not more of them than this value
+    exact_threshold = 1000
+
+    # z-score of the confidence intervals of adaptive_winning_prob() (95%)
+    confidence_z = 1.96
+
+    # how winning_prob() samples the games:
+    # SAMPLING_RANDOM - all the cards are random
+    # SAMPLING_STRATIFIED - every card is the next community card in the same number of games (up to 1)
+    # SAMPLING_BOARDS - all the possible sets of the remaining community cards are drawn without replacement
+    # (stratified if there are more than max_boards_strata sets, e.g. preflop)
+    # The stratified modes are off by default: most of the variance comes from the unknown opponents cards, not from
+    # the board, so comparison/equity_sampling_benchmark.py measures only 0.94-1.18 times fewer games for the same
+    # accuracy on the flop and the turn. There is no antithetic mode, a permutation of the cards has no natural
+    # antithetic counterpart
+    SAMPLING_RANDOM = "random"
+    SAMPLING_STRATIFIED = "stratified"
+    SAMPLING_BOARDS = "boards"
+    sampling = SAMPLING_RANDOM
+    max_boards_strata = 10000
+
+    # if True, the random numbers of winning_prob() are the same for all the players in the same round of the game
+    # (common random numbers), so their estimates of the same spot are consistent. Seeded with shared_stream_seed.
+    # It doesn't reduce the variance of one estimate, only the differences between the players
+    shared_stream = False
+    shared_stream_seed = 0
+
+    # all the sets of the remaining community cards by the number of cards that can be drawn and the size of the set,
+    # only the sets that are not more than max_boards_strata are stored
+    _boards_strata = {}
+
+    # winning probabilities shared by all the players, keyed by the suit isomorphic spot. Set to None to disable
+    equity_cache = EquityCache()
+
+    # if True, the sampled probabilities are cached too, otherwise only the exact (enumerated) ones. A cached sampled
+    # value is returned for the spot every time, with the same sampling error
+    cache_sampled = False
 
     def __init__(self, player_profile: PlayerProfile = None):
         self.game_info = GameInfo()
@@ -21,6 +64,13 @@ class PlayerBase:
     def update_player_profile(self, player_profile: PlayerProfile):
         self.player_profile = player_profile
 
+    def needs_broadcast(self) -> bool:
+        """
+        :return: True if the player needs the information about the game after every change (e.g. to follow the other
+        players actions), False if it is enough to get it right before the own action and in the end of the game
+        """
+        return True
+
     def action(self):
         """Returns the bet the player did"""
         pass
@@ -48,74 +98,306 @@ class PlayerBase:
         """Passing earned value in the end of the game"""
         pass
 
-    def winning_prob(self, iter_num=200) -> float:
+    def winning_prob(self, iter_num=200, exact_threshold=None, sampling=None, shared_stream=None) -> float:
         """
         Calculate probability of winning, knowing the cards. \n
-        NOTE: Instead of using mathematical formulas, it simply iterates iter_num times.
+        NOTE: Instead of using mathematical formulas, it simply simulates iter_num games. All the games are drawn
+        and evaluated at once as numpy arrays. If the number of all possible outcomes (remaining community cards and
+        unknown opponents cards) is not greater than exact_threshold, all of them are enumerated instead,
+        which gives the exact probability (e.g. heads-up on the river there are only C(45, 2) = 990 outcomes). \n
+        The exact results are stored in PlayerBase.equity_cache by the suit isomorphic spot, so the spots
+        that occur again are not enumerated again (the sampled ones only if PlayerBase.cache_sampled is set).
+        Preflop the probability is taken from the PreflopEquity table if it exists.
+        :param iter_num: number of simulated games
+        :param exact_threshold: maximal number of outcomes to enumerate, PlayerBase.exact_threshold if None
+        :param sampling: one of PlayerBase.SAMPLING_*, PlayerBase.sampling if None
+        :param shared_stream: use the random numbers shared by the players, PlayerBase.shared_stream if None
         :return: Probability of winning the game up to 3 digits
         """
-        cards = Card.all_possible_cards()
+        return self._winning_prob(iter_num, exact_threshold, sampling=sampling, shared_stream=shared_stream)[0]
+
+    def adaptive_winning_prob(self, max_iter=400, batch_size=50, boundaries=(), half_width=0.0,
+                              exact_threshold=None, sampling=None, shared_stream=None) -> tuple:
+        """
+        Same as winning_prob(), but simulates the games in batches (batch_size games first, then as many as
+        were simulated before) and stops as soon as
+        the confidence interval (Wilson score interval, PlayerBase.confidence_z) of the probability is tight enough:
+        it doesn't contain any of the boundaries or is not wider than 2 * half_width. Clear spots (very strong or
+        very weak hands) are resolved in a few batches
+        :param max_iter: maximal number of simulated games
+        :param batch_size: number of games simulated in the first batch
+        :param boundaries: sorted values the probability is compared to (e.g. the boundaries of the quantization)
+        :param half_width: maximal half width of the interval, 0 not to stop by the width
+        :param exact_threshold: maximal number of outcomes to enumerate, PlayerBase.exact_threshold if None
+        :param sampling: one of PlayerBase.SAMPLING_*, PlayerBase.sampling if None
+        :param shared_stream: use the random numbers shared by the players, PlayerBase.shared_stream if None
+        :return: probability of winning the game up to 3 digits and the number of the games simulated or enumerated
+        (0 if the probability was known)
+        """
+        return self._winning_prob(
+            max_iter, exact_threshold, batch_size, tuple(boundaries), half_width, sampling, shared_stream
+        )
+
+    def _winning_prob(self, iter_num, exact_threshold, batch_size=None, boundaries=(), half_width=0.0,
+                      sampling=None, shared_stream=None) -> tuple:
+        """
+        Implementation of winning_prob() and adaptive_winning_prob(). All the games are simulated at once
+        if batch_size is None
+        :return: probability of winning the game up to 3 digits and the number of the games simulated or enumerated
+        """
+        if exact_threshold is None:
+            exact_threshold = PlayerBase.exact_threshold
+        if sampling is None:
+            sampling = PlayerBase.sampling
+        if shared_stream is None:
+            shared_stream = PlayerBase.shared_stream
+
+        deck_ids, community_mask, player_mask, opponents_masks, num_unknown_pairs = self._equity_spot()
+
+        # nobody to lose to
+        if not opponents_masks and not num_unknown_pairs:
+            return 1.0, 0
+
+        deck_masks = np.left_shift(1, deck_ids)
+
+        # the probability only depends on the own cards, the community cards and the number of opponents
+        # if nobody showed the cards (otherwise they are not in the deck)
+        nobody_showed = len(deck_masks) + len(self.game_info.shown_community_cards) == 50
+
+        # preflop the probabilities of all the starting hands are precomputed
+        if nobody_showed and not self.game_info.shown_community_cards:
+            preflop_equity = PreflopEquity.get()
+            if preflop_equity is not None:
+                prob = preflop_equity.lookup(player_mask, num_unknown_pairs)
+                if prob is not None:
+                    return round(prob, 3), 0
+
+        # finding out number of cards to draw
+        community_cards_num_to_draw = 5 - len(self.game_info.shown_community_cards)
+
+        num_outcomes = PlayerBase._num_outcomes(len(deck_masks), community_cards_num_to_draw, num_unknown_pairs)
+        is_exact = num_outcomes <= exact_threshold
+
+        cache = PlayerBase.equity_cache
+        cache_key = None
+        if cache is not None and nobody_showed and (is_exact or PlayerBase.cache_sampled):
+            cache_key = SuitIsomorphism.canonical_key(player_mask, community_mask, num_unknown_pairs) \
+                + (None if is_exact else (iter_num, batch_size, boundaries, half_width, sampling, shared_stream),)
+            prob = cache.get(cache_key)
+            if prob is not None:
+                return prob, 0
+
+        if is_exact:
+            drawn_idx = PlayerBase._enumerate_draws(len(deck_masks), community_cards_num_to_draw, num_unknown_pairs)
+            num_won = PlayerBase._count_won(
+                deck_masks[drawn_idx], community_mask, player_mask, opponents_masks, community_cards_num_to_draw
+            )
+            num_games = len(drawn_idx)
+        else:
+            rng = self._sampling_rng(shared_stream)
+            num_to_draw = community_cards_num_to_draw + 2 * num_unknown_pairs
+            strata = PlayerBase._sampling_strata(len(deck_ids), community_cards_num_to_draw, sampling)
+
+            # the batches grow twice every time, so that clear spots stop early and the others are not split
+            # into many small batches
+            num_won = 0
+            num_games = 0
+            while num_games < iter_num:
+                num_batch_games = iter_num - num_games if batch_size is None \
+                    else min(max(batch_size, num_games), iter_num - num_games)
+                drawn_idx = PlayerBase._sample_draws(rng, deck_ids, num_to_draw, num_batch_games, strata)
+                num_won += PlayerBase._count_won(
+                    deck_masks[drawn_idx], community_mask, player_mask, opponents_masks, community_cards_num_to_draw
+                )
+                num_games += num_batch_games
+
+                if PlayerBase._is_resolved(num_won, num_games, boundaries, half_width):
+                    break
+
+        prob = round(num_won / num_games, 3)
+        if cache_key is not None:
+            cache.put(cache_key, prob)
+
+        return prob, num_games
+
+    @staticmethod
+    def _wilson_interval(num_won: int, num_games: int, z: float) -> tuple:
+        """
+        :return: bounds of the Wilson score interval of the probability of winning
+        """
+        p = num_won / num_games
+        z2 = z * z / num_games
+        center = (p + z2 / 2) / (1 + z2)
+        half_width = z * sqrt(p * (1 - p) / num_games + z2 / (4 * num_games)) / (1 + z2)
+        return center - half_width, center + half_width
+
+    @staticmethod
+    def _is_resolved(num_won: int, num_games: int, boundaries: tuple, half_width: float) -> bool:
+        """
+        :return: True if the confidence interval of the probability doesn't contain any of the boundaries
+        (if there are any) or is not wider than 2 * half_width (if it is positive)
+        """
+        if not boundaries and half_width <= 0:
+            return False
+
+        low, high = PlayerBase._wilson_interval(num_won, num_games, PlayerBase.confidence_z)
+        if boundaries and bisect(boundaries, low) != bisect(boundaries, high):
+            return False
+        return half_width <= 0 or (high - low) / 2 <= half_width
+
+    def _equity_spot(self) -> tuple:
+        """
+        Collects the cards the winning probability depends on
+        :return: int64 array of the ids of the cards that can be drawn, mask of the shown community cards,
+        mask of the player's cards, list of the masks of the opponents cards that are known
+        and the number of the opponents with unknown cards
+        """
+        # mask of the cards that can't be drawn
+        known_mask = Card.to_mask(self.game_info.shown_community_cards) | Card.to_mask(self.player_profile.cards)
 
         for player_profile in self.game_info.players_profiles.values():
             if player_profile.showed_cards:
-                for card in player_profile.cards:
-                    cards.remove(card)
+                known_mask |= Card.to_mask(player_profile.cards)
 
-        for card in self.game_info.shown_community_cards:
-            cards.remove(card)
+        deck_ids = np.array([card.id for card in Card.deck() if not card.mask & known_mask], dtype=np.int64)
 
-        if not self.player_profile.showed_cards:
-            for card in self.player_profile.cards:
-                cards.remove(card)
+        community_mask = Card.to_mask(self.game_info.shown_community_cards)
+        player_mask = Card.to_mask(self.player_profile.cards)
 
-        final_community_cards = deepcopy(self.game_info.shown_community_cards)
-
-        # the first element of the players_cards is always this player cards
-        players_cards = [deepcopy(self.player_profile.cards)]
+        # masks of the opponents cards that are known
+        opponents_masks = []
 
         num_unknown_pairs = 0
         for player_profile in self.game_info.players_profiles.values():
             if not (player_profile.out_of_money or player_profile.fold) \
                     and player_profile.id != self.player_profile.id:
                 if player_profile.showed_cards:
-                    players_cards.append(deepcopy(player_profile.cards))
+                    opponents_masks.append(Card.to_mask(player_profile.cards))
                 else:
-                    players_cards.append([])
                     num_unknown_pairs += 1
 
-        # finding out number of cards to draw
-        community_cards_num_to_draw = 5 - len(final_community_cards)
-
-        # number of winning iterations
-        num_won = 0
-
-        for it in range(iter_num):
-            it_players_cards = deepcopy(players_cards)
-            it_community_cards = deepcopy(final_community_cards)
-
-            drawn_cards = sample(cards, k=community_cards_num_to_draw + 2 * num_unknown_pairs)
-            it_community_cards.extend(drawn_cards[:community_cards_num_to_draw])
-
-            cnt = 0
-            for i in range(len(it_players_cards)):
-                if not it_players_cards[i]:
-                    it_players_cards[i] = drawn_cards[
-                                          community_cards_num_to_draw + 2 * cnt: community_cards_num_to_draw + 2 * cnt + 2]
-                    cnt += 1
-                it_players_cards[i].extend(it_community_cards)
-
-            won = True
-            for i in range(1, len(it_players_cards)):
-                if CombinationFinder.combination_comparator(it_players_cards[0], it_players_cards[i]) < 0:
-                    won = False
-                    break
+        return deck_ids, community_mask, player_mask, opponents_masks, num_unknown_pairs
+
+    @staticmethod
+    def _num_outcomes(num_cards: int, num_community: int, num_pairs: int) -> int:
+        """
+        :return: number of ways to draw num_community community cards and then num_pairs ordered pairs of
+        the opponents cards out of num_cards cards
+        """
+        num_outcomes = comb(num_cards, num_community)
+        num_cards -= num_community
+        for _ in range(num_pairs):
+            num_outcomes *= comb(num_cards, 2)
+            num_cards -= 2
+        return num_outcomes
+
+    @staticmethod
+    def _enumerate_draws(num_cards: int, num_community: int, num_pairs: int) -> np.ndarray:
+        """
+        :return: all the outcomes counted by _num_outcomes(). Array of shape (outcomes, num_community + 2 * num_pairs)
+        of the indexes of the drawn cards: community cards first, then the pairs of the opponents cards
+        """
+        outcomes = []
+
+        def draw_pairs(drawn: tuple, available: list, pairs_left: int):
+            if pairs_left == 0:
+                outcomes.append(drawn)
+                return
+            for pair in combinations(available, 2):
+                draw_pairs(drawn + pair, [i for i in available if i not in pair], pairs_left - 1)
 
-            if won:
-                num_won += 1
+        for community in combinations(range(num_cards), num_community):
+            draw_pairs(community, [i for i in range(num_cards) if i not in community], num_pairs)
+
+        return np.array(outcomes, dtype=np.int64).reshape(len(outcomes), num_community + 2 * num_pairs)
+
+    def _sampling_rng(self, shared_stream: bool) -> np.random.Generator:
+        """
+        :param shared_stream: if True, the generator is the same for all the players in the same round of the game
+        :return: generator of the random numbers of the simulated games
+        """
+        game_idx = self.game_info.game_idx
+        round_idx = self.game_info.round_idx
+        if shared_stream and game_idx is not None and round_idx is not None:
+            return np.random.default_rng([PlayerBase.shared_stream_seed, game_idx, round_idx])
+
+        # The generator is seeded from random, so that seed() still makes the games reproducible
+        return np.random.default_rng(getrandbits(64))
+
+    @staticmethod
+    def _sampling_strata(num_cards: int, num_community: int, sampling: str):
+        """
+        :param num_cards: number of the cards that can be drawn
+        :param num_community: number of the community cards to draw
+        :param sampling: one of PlayerBase.SAMPLING_*
+        :return: array of shape (strata, cards) of the indexes of the cards every stratum starts with
+        (see _sample_draws()), None if the games are not stratified
+        """
+        if sampling == PlayerBase.SAMPLING_RANDOM or num_community == 0:
+            return None
+        # too many sets of the community cards to draw every one of them, only the first card is stratified
+        too_many_boards = comb(num_cards, num_community) > PlayerBase.max_boards_strata
+        if sampling == PlayerBase.SAMPLING_STRATIFIED or sampling == PlayerBase.SAMPLING_BOARDS and too_many_boards:
+            return np.arange(num_cards, dtype=np.int64)[:, None]
+        if sampling == PlayerBase.SAMPLING_BOARDS:
+            strata = PlayerBase._boards_strata.get((num_cards, num_community))
+            if strata is None:
+                strata = np.array(list(combinations(range(num_cards), num_community)), dtype=np.int64)
+                PlayerBase._boards_strata[(num_cards, num_community)] = strata
+            return strata
+        raise ValueError(f"Unknown sampling {sampling}")
+
+    @staticmethod
+    def _sample_draws(rng: np.random.Generator, deck_ids: np.ndarray, num_to_draw: int, iter_num: int,
+                      strata: np.ndarray = None) -> np.ndarray:
+        """
+        :param rng: generator of the random numbers
+        :param deck_ids: ids of the cards that can be drawn
+        :param num_to_draw: number of the cards drawn in every game
+        :param iter_num: number of the games
+        :param strata: array of shape (strata, cards) of the indexes of the first cards drawn. Every stratum
+        is used in the same number of games (up to 1, the strata are shuffled), the other cards are random
+        :return: array of shape (iter_num, num_to_draw) of the indexes of the drawn cards.
+        Every row is the prefix of the random permutation of the cards
+        """
+        # the random number of every card doesn't depend on the other known cards, so that the shared streams
+        # of the players give the same cards as far as possible
+        keys = rng.random((iter_num, 52))[:, deck_ids]
+        if strata is None:
+            return np.argsort(keys, axis=1)[:, :num_to_draw]
+
+        num_strata, num_first = strata.shape
+        order = np.concatenate([rng.permutation(num_strata) for _ in range(-(-iter_num // num_strata))])
+        first_idx = strata[order[:iter_num]]
+
+        # the first cards go after all the others
+        np.put_along_axis(keys, first_idx, 2.0, axis=1)
+        return np.hstack((first_idx, np.argsort(keys, axis=1)[:, :num_to_draw - num_first]))
+
+    @staticmethod
+    def _count_won(drawn_masks: np.ndarray, community_mask: int, player_mask: int, opponents_masks: list,
+                   num_community: int) -> int:
+        """
+        :param drawn_masks: array of shape (games, num_community + 2 * unknown pairs) of the drawn cards masks:
+        community cards first, then the pairs of the opponents cards
+        :param community_mask: mask of the shown community cards
+        :param player_mask: mask of the player's cards
+        :param opponents_masks: masks of the opponents cards that are known
+        :param num_community: number of the community cards drawn
+        :return: number of games where nobody has a stronger hand than the player
+        """
+        num_games = len(drawn_masks)
+        it_community_masks = community_mask | np.bitwise_or.reduce(drawn_masks[:, :num_community], axis=1)
 
-        # print(self.player_profile.cards, self.game_info.shown_community_cards, num_won / iter_num)
+        # the columns are the player's hand and then the opponents hands in every game
+        hands_masks = [np.full(num_games, mask, dtype=np.int64) for mask in [player_mask] + opponents_masks]
+        for i in range(num_community, drawn_masks.shape[1], 2):
+            hands_masks.append(drawn_masks[:, i] | drawn_masks[:, i + 1])
 
-        return round(num_won / iter_num, 3)
+        # the board of every game is analyzed once and all the hands are evaluated at once
+        board_state = HandEvaluator.board_state_batch(it_community_masks)
+        ranks = HandEvaluator.evaluate_hole_batch(board_state, np.stack(hands_masks, axis=1))
+        return int(np.count_nonzero(ranks[:, 0] >= ranks[:, 1:].max(axis=1)))
 
 
 
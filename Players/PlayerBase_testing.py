@@ -0,0 +1,46 @@
+from random import seed
+
+from poker.comparison.equity_sampling_benchmark import make_spot
+from poker.environment.Card import Card
+from poker.Players.PlayerBase import PlayerBase
+
+"""
+Checks of the boards sampling of PlayerBase.winning_prob() in the spots the preflop table and the cache don't cover
+(the opponent showed the cards)
+"""
+
+# AK of hearts against 2 and 7 heads-up preflop, enumerated once with exact_threshold=10 ** 7
+PREFLOP_EXACT = 0.695
+
+
+if __name__ == '__main__':
+    seed(0)
+    PlayerBase._boards_strata.clear()
+    cards = [Card("H1"), Card("Hd")]
+    shown_cards = ([Card("S2"), Card("C7")],)
+    boards = PlayerBase.SAMPLING_BOARDS
+
+    # TEST 1 PREFLOP THE BOARDS ARE NOT ENUMERATED (C(48, 5) SETS), ONLY THE FIRST CARD IS STRATIFIED
+    player = make_spot(cards, [], 1, shown_cards)
+    preflop_prob = player.winning_prob(2000, exact_threshold=0, sampling=boards)
+    strata = PlayerBase._sampling_strata(48, 5, boards)
+    print(f"preflop: {preflop_prob} (exact {PREFLOP_EXACT}), strata {strata.shape}")
+    assert abs(preflop_prob - PREFLOP_EXACT) < 0.04
+    assert strata.shape == (48, 1) and not PlayerBase._boards_strata
+
+    # TEST 2 ON THE FLOP EVERY ONE OF C(45, 2) = 990 BOARDS IS DRAWN ONCE, SO THE ESTIMATE IS EXACT
+    player = make_spot(cards, [Card("D3"), Card("D8"), Card("Cb")], 1, shown_cards)
+    flop_prob = player.winning_prob(990, exact_threshold=0, sampling=boards)
+    flop_exact = player.winning_prob()
+    print(f"flop: {flop_prob} (exact {flop_exact})")
+    assert flop_prob == flop_exact
+
+    # TEST 3 THE SAME ON THE TURN WITH 44 BOARDS DRAWN 10 TIMES EACH
+    player = make_spot(cards, [Card("D3"), Card("D8"), Card("Cb"), Card("S9")], 1, shown_cards)
+    turn_prob = player.winning_prob(440, exact_threshold=0, sampling=boards)
+    turn_exact = player.winning_prob()
+    print(f"turn: {turn_prob} (exact {turn_exact}), stored strata {list(PlayerBase._boards_strata)}")
+    assert turn_prob == turn_exact
+    assert list(PlayerBase._boards_strata) == [(45, 2), (44, 1)]
+
+    print("ALL TESTS PASSED")
@@ -6,6 +6,9 @@ class PlayerProfile:
     """
     Class of profile
     """
+    # names of all the values of the profile
+    FIELDS = ("money", "cards", "id", "out_of_money", "fold", "showed_cards", "all_in", "current_round_bet", "bet")
+
     def __init__(self, start_value, player_id):
         self.money = start_value
         self.cards = []
@@ -20,6 +23,12 @@ class PlayerProfile:
     def get_cards(self):
         deepcopy(self.cards)
 
+    def profile_values(self) -> dict:
+        """
+        :return: all the values of the profile by the names of PlayerProfile.FIELDS
+        """
+        return dict(vars(self))
+
     def __str__(self):
         s = ""
         for key, val in vars(self).items():
@@ -53,8 +62,29 @@ class PlayerProfile:
         if player_profile2.fold or player_profile2.out_of_money:
             return 1
 
-        dif = CombinationFinder.combination_comparator(player_profile1.cards, player_profile2.cards)
+        dif = CombinationFinder.hand_key(player_profile1.cards) - CombinationFinder.hand_key(player_profile2.cards)
         if dif != 0:
             return dif
 
         return player_profile1.bet - player_profile2.bet
+
+
+class PlayerProfileSnapshot(PlayerProfile):
+    """
+    Read-only copy of the profile at the moment it was taken. The snapshots are shared (e.g. by all the players
+    that get the same GameInfo), so they can't be changed. The cards are stored as a tuple
+    """
+    def __init__(self, player_profile, hide_cards: bool = False):
+        """
+        :param player_profile: profile to copy (PlayerProfile or SeatView)
+        :param hide_cards: if True, the cards are not copied (the snapshot has no cards)
+        """
+        values = player_profile.profile_values()
+        values["cards"] = () if hide_cards else tuple(player_profile.cards)
+        self.__dict__.update(values)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("PlayerProfileSnapshot is read-only")
+
+    def __delattr__(self, key):
+        raise AttributeError("PlayerProfileSnapshot is read-only")
@@ -0,0 +1,167 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from poker.environment.Card import Card
+from poker.environment.HandEvaluator import HandEvaluator
+from poker.environment.SuitIsomorphism import SuitIsomorphism
+
+
+class PreflopEquity:
+    """
+    Precomputed preflop winning probabilities of all 169 classes of the starting hands (up to the suits)
+    against 1 to 9 opponents with unknown cards. The probabilities have the same meaning as
+    PlayerBase.winning_prob(): the player wins if nobody has a stronger hand. \n
+    File format (numpy .npz): hole_masks - canonical masks of the classes (see SuitIsomorphism), int64 of shape (169,),
+    equity - probabilities, float64 of shape (169, MAX_OPPONENTS), num_samples - number of simulated games per value.
+    Generate the file with: python -m poker.Players.PreflopEquity build
+    """
+    MAX_OPPONENTS = 9
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop_equity.npz")
+    # environment variable to use the file from another location
+    PATH_ENV = "POKER_PREFLOP_EQUITY"
+
+    # number of games simulated at once
+    _chunk = 1 << 14
+
+    # shared instance, loaded on the first use
+    _table = None
+    _table_checked = False
+
+    def __init__(self, path: str):
+        """
+        Loads the table
+        :param path: path to the file generated by build()
+        """
+        with np.load(path) as data:
+            self.hole_masks = data["hole_masks"]
+            self.equity = data["equity"]
+            self.num_samples = int(data["num_samples"])
+
+        self.path = path
+        self._class_idx = {hole_mask: i for i, hole_mask in enumerate(self.hole_masks.tolist())}
+        self._equity_list = self.equity.tolist()
+
+    @staticmethod
+    def get():
+        """
+        :return: the shared table if its file exists, None otherwise. The file is only looked up once
+        """
+        if not PreflopEquity._table_checked:
+            PreflopEquity._table_checked = True
+            path = os.environ.get(PreflopEquity.PATH_ENV, PreflopEquity.DEFAULT_PATH)
+            if os.path.exists(path):
+                PreflopEquity._table = PreflopEquity(path)
+
+        return PreflopEquity._table
+
+    def lookup(self, hole_mask: int, num_opponents: int):
+        """
+        :param hole_mask: mask of the player's cards
+        :param num_opponents: number of the opponents with unknown cards
+        :return: probability of winning, None if the number of opponents is not in the table
+        """
+        if not 1 <= num_opponents <= PreflopEquity.MAX_OPPONENTS:
+            return None
+
+        hole_class, _ = SuitIsomorphism.canonicalize(hole_mask, 0)
+        return self._equity_list[self._class_idx[hole_class]][num_opponents - 1]
+
+    @staticmethod
+    def hole_classes() -> list:
+        """
+        :return: sorted canonical masks of all the classes of the starting hands
+        """
+        return sorted({
+            SuitIsomorphism.canonicalize(Card.to_mask(cards), 0)[0] for cards in combinations(Card.deck(), 2)
+        })
+
+    @staticmethod
+    def _simulate(hole_mask: int, num_opponents: int, num_samples: int, seed) -> int:
+        """
+        Simulates the games of the player against the opponents
+        :param hole_mask: mask of the player's cards
+        :param num_opponents: number of the opponents
+        :param num_samples: number of the games
+        :param seed: seed of the numpy generator
+        :return: number of the games where nobody has a stronger hand than the player
+        """
+        rng = np.random.default_rng(seed)
+        deck_masks = np.array([card.mask for card in Card.deck() if not card.mask & hole_mask], dtype=np.int64)
+        num_to_draw = 5 + 2 * num_opponents
+
+        num_won = 0
+        for start in range(0, num_samples, PreflopEquity._chunk):
+            num_games = min(PreflopEquity._chunk, num_samples - start)
+            drawn_masks = deck_masks[np.argsort(rng.random((num_games, len(deck_masks))), axis=1)[:, :num_to_draw]]
+
+            board_state = HandEvaluator.board_state_batch(np.bitwise_or.reduce(drawn_masks[:, :5], axis=1))
+            player_ranks = HandEvaluator.evaluate_hole_batch(board_state, np.full(num_games, hole_mask, dtype=np.int64))
+            opponents_ranks = HandEvaluator.evaluate_hole_batch(board_state, drawn_masks[:, 5::2] | drawn_masks[:, 6::2])
+            num_won += int(np.count_nonzero(player_ranks >= opponents_ranks.max(axis=1)))
+
+        return num_won
+
+    @staticmethod
+    def build(path: str = DEFAULT_PATH, num_samples: int = 200000, num_workers: int = None, seed: int = 0,
+              verbose: bool = True):
+        """
+        Generates the table file, simulating every value in a separate process
+        :param path: where to save the table
+        :param num_samples: number of the games simulated for every value
+        :param num_workers: number of the processes, number of the CPUs if None
+        :param seed: seed of the simulations
+        :param verbose: print progress
+        """
+        hole_masks = PreflopEquity.hole_classes()
+        tasks = [
+            (hole_mask, num_opponents)
+            for hole_mask in hole_masks for num_opponents in range(1, PreflopEquity.MAX_OPPONENTS + 1)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+        equity = np.zeros((len(hole_masks), PreflopEquity.MAX_OPPONENTS))
+        with ProcessPoolExecutor(num_workers) as executor:
+            results = executor.map(
+                PreflopEquity._simulate,
+                [hole_mask for hole_mask, _ in tasks],
+                [num_opponents for _, num_opponents in tasks],
+                [num_samples] * len(tasks),
+                seeds,
+                chunksize=PreflopEquity.MAX_OPPONENTS
+            )
+            for k, num_won in enumerate(results):
+                equity[k // PreflopEquity.MAX_OPPONENTS, k % PreflopEquity.MAX_OPPONENTS] = num_won / num_samples
+                if verbose and (k + 1) % PreflopEquity.MAX_OPPONENTS == 0:
+                    print(f"Simulated {(k + 1) // PreflopEquity.MAX_OPPONENTS} classes out of {len(hole_masks)}")
+
+        np.savez(
+            path,
+            hole_masks=np.array(hole_masks, dtype=np.int64),
+            equity=equity,
+            num_samples=np.int64(num_samples)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or print the preflop winning probabilities table")
+    parser.add_argument("command", choices=["build", "print"])
+    parser.add_argument("--path", default=os.environ.get(PreflopEquity.PATH_ENV, PreflopEquity.DEFAULT_PATH))
+    parser.add_argument("--samples", type=int, default=200000, help="number of simulated games for every value")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, number of CPUs by default")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        PreflopEquity.build(args.path, args.samples, args.workers, args.seed)
+        print(f"Saved to {args.path}")
+    else:
+        table = PreflopEquity(args.path)
+        print(f"{table.num_samples} games per value")
+        for hole_mask, equity in zip(table.hole_masks.tolist(), table.equity):
+            cards = " ".join(card.val for card in Card.from_mask(hole_mask))
+            print(cards, " ".join(f"{p:.3f}" for p in equity))
@@ -47,9 +47,41 @@ class RLPlayer(PlayerBase):
         self.raise_weights = [[0] * self.actions_raise_num for _ in range(self.MAX_LEN)]
         self.raise_bias = [0 for _ in range(self.actions_raise_num)]
 
+        self._init_features_cache()
+
         if self.is_learning:
             self.learn()
 
+    def __setstate__(self, state):
+        """Restores the pickled player. Players pickled before the features cache was added get an empty one"""
+        self.__dict__.update(state)
+        if "_features_cache" not in state:
+            self._init_features_cache()
+
+    def _init_features_cache(self):
+        """
+        Features computed in the current round, keyed by the state they depend on
+        (see _features_key()), and the counters of the cache
+        """
+        self._features_cache = {}
+        self._features_cache_round = None
+        self.features_cache_hits = 0
+        self.features_cache_misses = 0
+
+    def features_cache_stats(self) -> dict:
+        """
+        :return: counters and the current size of the features cache
+        """
+        return {
+            "size": len(self._features_cache),
+            "hits": self.features_cache_hits,
+            "misses": self.features_cache_misses,
+        }
+
+    def needs_broadcast(self):
+        """While learning, the player updates the weights with the information after every change (see _update())"""
+        return self.is_learning
+
     def update_game_info(self, *args):
         """Update game info."""
 
@@ -138,9 +170,55 @@ class RLPlayer(PlayerBase):
             self.type_bias = deepcopy(bias[0])
             self.raise_bias = deepcopy(bias[1])
 
+    def _features_key(self) -> tuple:
+        """
+        :return: the state the features depend on in the current round
+        """
+        num_active_players = 0
+        for player_profile in self.game_info.players_profiles.values():
+            if not (player_profile.fold or player_profile.out_of_money):
+                num_active_players += 1
+
+        return (
+            self.game_info.current_bet,
+            self.player_profile.money,
+            self.player_profile.bet,
+            self.player_profile.current_round_bet,
+            num_active_players,
+        )
+
     def get_features(self):
         """
-        Features are current bet [0], amount of money left [1], probability of winning [2] and amount already bet [3]
+        Features are current bet [0], amount of money left [1], probability of winning [2] and amount already bet [3].
+        The features are computed once for every state (see _features_key()) and cached until the round changes
+        :return: a list of features
+        """
+        # the same player can play several games with the same indexes (e.g. at a new table), so the cards
+        # are a part of the round
+        current_round = (
+            self.game_info.game_idx,
+            self.game_info.round_idx,
+            tuple(self.player_profile.cards),
+            tuple(self.game_info.shown_community_cards),
+        )
+        if current_round != self._features_cache_round:
+            self._features_cache_round = current_round
+            self._features_cache.clear()
+
+        key = self._features_key()
+        f = self._features_cache.get(key)
+        if f is not None:
+            self.features_cache_hits += 1
+            return list(f)
+
+        self.features_cache_misses += 1
+        f = self._compute_features()
+        self._features_cache[key] = f
+        return list(f)
+
+    def _compute_features(self):
+        """
+        Computes the features, see get_features()
         :return: a list of features
         """
         f = [
@@ -1,13 +1,17 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from poker.Players import MCCFRPlayer, RLPlayer
 from poker.Players.MCCFRPlayer import MCCFPlayer
-from poker.Players.RLPlayer import RLPlayer
 from pickle import load
 from poker.environment.Game import Game
+from poker.environment.SimulationRunner import SimulationRunner
 import logging
 from logging import WARNING, DEBUG
+from os.path import dirname, join
 import sys
 
+players_dir = join(dirname(__file__), "..", "Players")
+
 
 def calculate_gain(players, init_val=1000, small_blind=10, num_games=50, cnt_limit=50):
     """
@@ -44,6 +48,57 @@ def calculate_gain(players, init_val=1000, small_blind=10, num_games=50, cnt_lim
 
     return players_gain_history
 
+def calculate_gain_parallel(players_factory, init_val=1000, small_blind=10, num_games=50, cnt_limit=50,
+                            num_workers=None, shuffle_seats=False):
+    """
+    Same as calculate_gain(), but the games are played by SimulationRunner on all the cores
+    :param players_factory: function without arguments that returns the player agents (defined at the top level of
+    the module, every worker process creates its own players)
+    :param num_workers: number of the processes, all the cores if None
+    :param shuffle_seats: randomly permute the seats of the players in every game
+    :return: the gains of the players (in the order of the factory) in every game
+    """
+    runner = SimulationRunner(num_workers=num_workers, start_value=init_val, small_blind=small_blind,
+                              shuffle_seats=shuffle_seats)
+
+    players_gain_history = []
+    for result in runner.run(players_factory, num_games, cnt_limit):
+        players_gain_history += result.gains
+
+    return players_gain_history
+
+
+def load_agent(file_name):
+    """Loads the pickled agent (or the MCCFR nodes) from the Players folder"""
+    # the agents were pickled with the modules imported by their file names
+    sys.modules.setdefault("MCCFRPlayer", MCCFRPlayer)
+    sys.modules.setdefault("RLPlayer", RLPlayer)
+
+    with open(join(players_dir, file_name), "rb") as f:
+        return load(f)
+
+
+def mccfr_player():
+    MCCFPlayer.nodes = load_agent("MCCFRPlayer_nodes_prob10_sample400.pkl")
+    return MCCFPlayer(is_learning=False)
+
+
+def mccfr_vs_rl_unweighted():
+    return [mccfr_player(), load_agent("RLPlayer_agent_sw900_p3_unweighted.pkl")]
+
+
+def rl_weighted_vs_mccfr():
+    return [load_agent("RLPlayer_agent_sw900_p3_weighted.pkl"), mccfr_player()]
+
+
+def rl_unweighted_vs_rl_weighted():
+    return [load_agent("RLPlayer_agent_sw900_p3_unweighted.pkl"), load_agent("RLPlayer_agent_sw900_p3_weighted.pkl")]
+
+
+def mccfr_vs_mccfr():
+    return [mccfr_player(), MCCFPlayer(is_learning=False)]
+
+
 def get_cul(players_gain_history):
     """
     :param players_gain_history: Gain history over time
@@ -76,18 +131,7 @@ if __name__ == '__main__':
 
     # ====================================
     # MCCFRPlayer vs RLPlayer(unweighted)
-    MCCFR_nodes_file_name = "../Players/MCCFRPlayer_nodes_prob10_sample400.pkl"
-    with open(MCCFR_nodes_file_name, "rb") as f:
-        MCCFPlayer.nodes = load(f)
-    player1 = MCCFPlayer(is_learning=False)
-
-    unweighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_unweighted.pkl"
-    with open(unweighted_agent_file_name, "rb") as f:
-        player2 = load(f)
-
-    players = [player1, player2]
-
-    players_gain_history = np.array(calculate_gain(players, num_games=1000))
+    players_gain_history = np.array(calculate_gain_parallel(mccfr_vs_rl_unweighted, num_games=1000))
     players_cum_gain_history = np.cumsum(players_gain_history, axis=0)
 
     # print(players_gain_history[:5])
@@ -111,18 +155,7 @@ if __name__ == '__main__':
 
     # ====================================
     # MCCFRPlayer vs RLPlayer(weighted)
-    MCCFR_nodes_file_name = "../Players/MCCFRPlayer_nodes_prob10_sample400.pkl"
-    with open(MCCFR_nodes_file_name, "rb") as f:
-        MCCFPlayer.nodes = load(f)
-    player1 = MCCFPlayer(is_learning=False)
-
-    weighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_weighted.pkl"
-    with open(weighted_agent_file_name, "rb") as f:
-        player2 = load(f)
-
-    players = [player2, player1]
-
-    players_gain_history = np.array(calculate_gain(players, num_games=1000))
+    players_gain_history = np.array(calculate_gain_parallel(rl_weighted_vs_mccfr, num_games=1000))
     players_cum_gain_history = np.cumsum(players_gain_history, axis=0)
 
     time = np.linspace(0, players_cum_gain_history.shape[0] - 1, players_cum_gain_history.shape[0])
@@ -140,20 +173,8 @@ if __name__ == '__main__':
 
 
     # ====================================
-    # RLPlayer(weighted) vs RLPlayer(weighted)
-    unweighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_unweighted.pkl"
-    with open(unweighted_agent_file_name, "rb") as f:
-        player1 = load(f)
-
-    weighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_weighted.pkl"
-    with open(unweighted_agent_file_name, "rb") as f:
-        player2 = load(f)
-
-
-
-    players = [player1, player2]
-
-    players_gain_history = np.array(calculate_gain(players, num_games=1000))
+    # RLPlayer(unweighted) vs RLPlayer(weighted)
+    players_gain_history = np.array(calculate_gain_parallel(rl_unweighted_vs_rl_weighted, num_games=1000))
     players_cum_gain_history = np.cumsum(players_gain_history, axis=0)
 
     time = np.linspace(0, players_cum_gain_history.shape[0] - 1, players_cum_gain_history.shape[0])
@@ -171,16 +192,8 @@ if __name__ == '__main__':
 
 
     # ====================================
-    # MCCFRPlayer vs RLPlayer(weighted)
-    MCCFR_nodes_file_name = "../Players/MCCFRPlayer_nodes_prob10_sample400.pkl"
-    with open(MCCFR_nodes_file_name, "rb") as f:
-        MCCFPlayer.nodes = load(f)
-    player1 = MCCFPlayer(is_learning=False)
-    player2 = MCCFPlayer(is_learning=False)
-
-    players = [player1, player2]
-
-    players_gain_history = np.array(calculate_gain(players, num_games=1000))
+    # MCCFRPlayer vs MCCFRPlayer
+    players_gain_history = np.array(calculate_gain_parallel(mccfr_vs_mccfr, num_games=1000))
     players_cum_gain_history = np.cumsum(players_gain_history, axis=0)
 
     time = np.linspace(0, players_cum_gain_history.shape[0] - 1, players_cum_gain_history.shape[0])
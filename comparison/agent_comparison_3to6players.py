@@ -1,40 +1,19 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from poker.Players.MCCFRPlayer import MCCFPlayer
-from poker.Players.RLPlayer import RLPlayer
-from pickle import load
 from poker.environment.Game import Game
 import logging
 from logging import WARNING, DEBUG
 import sys
-from agent_comparison_1vs1 import calculate_gain
+from agent_comparison_1vs1 import calculate_gain_parallel, load_agent, mccfr_player
 
-def shuffled_gain(players, shuffles=100):
-    """Shuffles the players. Returns the gain history over time"""
 
-    n = len(players)
-    players_gain_history = []
-    for shuffle_idx in range(shuffles):
-        # permutation of players
-        perm = np.linspace(0, n - 1, n, dtype=int)
-        perm = np.random.permutation(perm)
-        permuted_players = [None] * n
-        for j in range(n):
-            permuted_players[perm[j]] = players[j]
+def two_of_each_type():
+    """2 MCCFRPlayers, 2 RLPlayers (unweighted) and 2 RLPlayers (weighted)"""
+    return [mccfr_player(), MCCFPlayer(is_learning=False),
+            load_agent("RLPlayer_agent_sw900_p3_unweighted.pkl"), load_agent("RLPlayer_agent_sw900_p2_unweighted.pkl"),
+            load_agent("RLPlayer_agent_sw900_p3_weighted.pkl"), load_agent("RLPlayer_agent_sw900_p3_weighted.pkl")]
 
-        permuted_gain_history = calculate_gain(permuted_players, num_games=10)
-        for t in range(len(permuted_gain_history)):
-            normalized_gain = [0] * n
-            for j in range(n):
-                normalized_gain[j] = permuted_gain_history[t][perm[j]]
-
-            permuted_gain_history[t] = normalized_gain
-
-        players_gain_history += permuted_gain_history
-
-        print(f"{shuffle_idx + 1} passed")
-
-    return players_gain_history
 
 if __name__ == "__main__":
 
@@ -48,29 +27,8 @@ if __name__ == "__main__":
 
     # ====================================
     # 2 MCCFRPlayers vs 2 RLPlayers (unweighted) vs 2 RLPlayers (weighted)
-    MCCFR_nodes_file_name = "../Players/MCCFRPlayer_nodes_prob10_sample400.pkl"
-    with open(MCCFR_nodes_file_name, "rb") as f:
-        MCCFPlayer.nodes = load(f)
-    player1 = MCCFPlayer(is_learning=False)
-    player2 = MCCFPlayer(is_learning=False)
-
-    unweighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_unweighted.pkl"
-    with open(unweighted_agent_file_name, "rb") as f:
-        player3 = load(f)
-    unweighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p2_unweighted.pkl"
-    with open(unweighted_agent_file_name, "rb") as f:
-        player4 = load(f)
-
-    weighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_weighted.pkl"
-    with open(weighted_agent_file_name, "rb") as f:
-        player5 = load(f)
-    weighted_agent_file_name = "../Players/RLPlayer_agent_sw900_p3_weighted.pkl"
-    with open(weighted_agent_file_name, "rb") as f:
-        player6 = load(f)
-
-    players = [player1, player2, player3, player4, player5, player6]
-
-    players_gain_history = np.array(shuffled_gain(players, 100))
+    # the seats are shuffled in every game, the gains are in the order of two_of_each_type()
+    players_gain_history = np.array(calculate_gain_parallel(two_of_each_type, num_games=1000, shuffle_seats=True))
     players_cum_gain_history = np.cumsum(players_gain_history, axis=0)
 
     MCCFR_cum_gain_history = (players_cum_gain_history[:, 0] + players_cum_gain_history[:, 1]) / 2
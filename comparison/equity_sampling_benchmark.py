@@ -0,0 +1,88 @@
+import sys
+from random import sample, seed
+from time import perf_counter
+
+import numpy as np
+
+from poker.environment.Card import Card
+from poker.environment.Game import GameInfo
+from poker.Players.PlayerBase import PlayerBase
+from poker.Players.PlayerProfile import PlayerProfile
+
+
+def make_spot(cards: list, community_cards: list, num_opponents: int, shown_cards: tuple = ()) -> PlayerBase:
+    """
+    :param cards: cards of the player
+    :param community_cards: shown community cards
+    :param num_opponents: number of the opponents
+    :param shown_cards: pairs of the cards of the first opponents, who showed them
+    :return: player in the spot
+    """
+    player = PlayerBase(PlayerProfile(1000, 0))
+    player.player_profile.cards = list(cards)
+
+    game_info = GameInfo()
+    game_info.shown_community_cards = list(community_cards)
+    game_info.players_profiles = {i: PlayerProfile(1000, i) for i in range(num_opponents + 1)}
+    for i, opponent_cards in enumerate(shown_cards, 1):
+        game_info.players_profiles[i].cards = list(opponent_cards)
+        game_info.players_profiles[i].showed_cards = True
+    game_info.game_idx = 0
+    game_info.round_idx = 0
+    player.update_game_info(game_info)
+
+    return player
+
+
+def random_spot(num_community: int, num_opponents: int) -> PlayerBase:
+    """
+    :return: player with random cards and num_community random community cards against num_opponents opponents
+    """
+    cards = sample(Card.deck(), 2 + num_community)
+    return make_spot(cards[:2], cards[2:], num_opponents)
+
+
+def standard_error_per_sample(players: list, references: list, iter_num: int, num_repeats: int, sampling: str):
+    """
+    Estimates the winning probabilities of the spots num_repeats times
+    :return: root mean squared error of the estimates times sqrt(iter_num) and the time of one estimate
+    """
+    squared_errors = []
+    start = perf_counter()
+    for player, reference in zip(players, references):
+        for _ in range(num_repeats):
+            estimate = player.winning_prob(iter_num, exact_threshold=0, sampling=sampling)
+            squared_errors.append((estimate - reference) ** 2)
+    elapsed = (perf_counter() - start) / (len(players) * num_repeats)
+
+    return np.sqrt(np.mean(squared_errors) * iter_num), elapsed
+
+
+if __name__ == '__main__':
+    seed(0)
+
+    # the estimates are not cached, so that every call is simulated
+    PlayerBase.equity_cache = None
+
+    num_spots = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    iter_num = 200
+    num_repeats = 20
+    reference_iter_num = 100000
+
+    modes = [PlayerBase.SAMPLING_RANDOM, PlayerBase.SAMPLING_STRATIFIED, PlayerBase.SAMPLING_BOARDS]
+
+    for street, num_community in [("flop", 3), ("turn", 4)]:
+        for num_opponents in [1, 3]:
+            players = [random_spot(num_community, num_opponents) for _ in range(num_spots)]
+            references = [player.winning_prob(reference_iter_num, exact_threshold=0) for player in players]
+
+            print(f"{street}, {num_opponents} opponents, {iter_num} games:")
+            random_error = None
+            for mode in modes:
+                error, elapsed = standard_error_per_sample(players, references, iter_num, num_repeats, mode)
+                if random_error is None:
+                    random_error = error
+                # how many times fewer games give the same accuracy as the random sampling
+                efficiency = (random_error / error) ** 2
+                print(f"    {mode:<10} standard error per sample {error:.3f}, "
+                      f"x{efficiency:.2f} fewer samples, {elapsed * 1000:.2f} ms per estimate")
@@ -0,0 +1,324 @@
+import numpy as np
+
+from .HandEvaluator import HandEvaluator
+from .TableState import TableState
+
+
+class BatchDecision:
+    """
+    State of the tables where a player has to act, passed to the policy of BatchGame.
+    Row r of every array describes the table tables[r] where the player at seats[r] acts
+    """
+    __slots__ = ("tables", "seats", "game_idx", "round_idx", "dealer_idx", "current_bet", "small_blind",
+                 "money", "bet", "round_bet", "status", "hole_cards", "community_cards")
+
+    def __init__(self, batch_game: "BatchGame", tables: np.ndarray, seats: np.ndarray):
+        self.tables = tables
+        self.seats = seats
+        self.game_idx = batch_game.game_idx[tables]
+        self.round_idx = batch_game.round_idx[tables]
+        self.dealer_idx = batch_game.dealer_idx[tables]
+        self.current_bet = batch_game.current_bet[tables]
+        self.small_blind = batch_game.small_blind
+
+        # money, bets and statuses of all the seats of the tables
+        self.money = batch_game.money[tables]
+        self.bet = batch_game.bet[tables]
+        self.round_bet = batch_game.round_bet[tables]
+        self.status = batch_game.status[tables]
+
+        # card ids of the acting player and of the shown community cards (-1 if the card is not shown yet)
+        self.hole_cards = batch_game.hole_cards[tables, seats]
+        self.community_cards = batch_game.shown_community_cards()[tables]
+
+    def __len__(self):
+        return len(self.tables)
+
+    def player_money(self) -> np.ndarray:
+        """Money of the acting players"""
+        return self.money[np.arange(len(self)), self.seats]
+
+    def player_round_bet(self) -> np.ndarray:
+        """Money already bet in the current round by the acting players"""
+        return self.round_bet[np.arange(len(self)), self.seats]
+
+    def fold(self) -> np.ndarray:
+        """Same as PlayerBase._fold() for all the acting players"""
+        return np.full(len(self), -1, dtype=np.int64)
+
+    def call(self) -> np.ndarray:
+        """Same as PlayerBase._call() for all the acting players"""
+        return self.current_bet - self.player_round_bet()
+
+    def raise_bet(self, amount) -> np.ndarray:
+        """Same as PlayerBase._raise() for all the acting players"""
+        return self.call() + np.maximum(np.asarray(amount, dtype=np.int64), 0)
+
+
+class BatchGame:
+    """
+    Plays many independent tables in lockstep, the state of all the tables is stored in numpy arrays
+    of shape (num_tables, num_seats). The rules are the same as in Game: the blinds, the order of the bets
+    in the betting rounds, the all-in and the split of the pot in game_end. \n
+    Instead of the players objects the game asks the policies for the bets of all the tables at once:
+    policy(decision: BatchDecision) -> int array of the bets (the same as PlayerBase.action(), -1 to fold)
+    """
+
+    def __init__(self, num_tables: int, num_seats: int, start_value: int, small_blind: int, policies,
+                 seed=None):
+        """
+        :param num_tables: number of the tables played at once
+        :param num_seats: number of the players at every table
+        :param start_value: initial amount of money of every player
+        :param small_blind: small blind
+        :param policies: one policy for all the seats or the list of policies by seats
+        :param seed: seed of the generator of the cards
+        """
+        self.num_tables = num_tables
+        self.num_seats = num_seats
+        self.small_blind = small_blind
+        self.policies = list(policies) if isinstance(policies, (list, tuple)) else [policies] * num_seats
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_tables, num_seats)
+        self.money = np.full(shape, start_value, dtype=np.int64)
+        self.bet = np.zeros(shape, dtype=np.int64)
+        self.round_bet = np.zeros(shape, dtype=np.int64)
+        self.status = np.zeros(shape, dtype=np.int64)
+
+        self.community_cards = np.zeros((num_tables, 5), dtype=np.int64)
+        self.hole_cards = np.zeros((num_tables, num_seats, 2), dtype=np.int64)
+
+        self.dealer_idx = np.zeros(num_tables, dtype=np.int64)
+        self.current_bet = np.zeros(num_tables, dtype=np.int64)
+        self.game_idx = np.zeros(num_tables, dtype=np.int64)
+        self.round_idx = np.zeros(num_tables, dtype=np.int64)
+
+        self._tables = np.arange(num_tables)
+
+    def count_active_players(self) -> np.ndarray:
+        """Number of players still in the game at every table"""
+        return np.count_nonzero(self.status & TableState.NOT_ACTIVE == 0, axis=1)
+
+    def can_raise_cnt(self) -> np.ndarray:
+        """Number of players that can raise at every table"""
+        return np.count_nonzero(self.status & TableState.CANT_RAISE == 0, axis=1)
+
+    def shown_community_cards(self) -> np.ndarray:
+        """Ids of the community cards shown at every table, -1 for the cards that are not shown yet"""
+        num_shown = np.select([self.round_idx >= 4, self.round_idx == 3, self.round_idx == 2], [5, 4, 3], 0)
+        return np.where(np.arange(5) < num_shown[:, None], self.community_cards, -1)
+
+    def give_cards(self, tables: np.ndarray, decks: np.ndarray = None):
+        """
+        Deals the cards in the same order as Game.give_cards(): 5 community cards, then 2 cards for every seat
+        :param tables: indexes of the tables
+        :param decks: card ids of shape (len(tables), 5 + 2 * num_seats), random if None
+        """
+        num_drawn_cards = 5 + 2 * self.num_seats
+        if decks is None:
+            decks = np.argsort(self.rng.random((len(tables), 52)), axis=1)[:, :num_drawn_cards]
+        decks = np.asarray(decks, dtype=np.int64)
+
+        self.community_cards[tables] = decks[:, :5]
+        self.hole_cards[tables] = decks[:, 5:num_drawn_cards].reshape(len(tables), self.num_seats, 2)
+
+    def _next_active_seat(self, tables: np.ndarray, seats: np.ndarray) -> np.ndarray:
+        """
+        :return: the next seat after every given one with the player still in the game
+        """
+        candidates = (seats[:, None] + np.arange(1, self.num_seats + 1)) % self.num_seats
+        active = self.status[tables[:, None], candidates] & TableState.NOT_ACTIVE == 0
+        return candidates[np.arange(len(tables)), np.argmax(active, axis=1)]
+
+    def _reset(self, tables: np.ndarray):
+        """Resets the seats after the game has finished (same as PlayerProfile.reset())"""
+        out_of_money = (self.money[tables] == 0) | (self.status[tables] & TableState.OUT_OF_MONEY != 0)
+        self.bet[tables] = 0
+        self.round_bet[tables] = 0
+        self.status[tables] = np.where(out_of_money, TableState.OUT_OF_MONEY, 0)
+
+    def _action_processing(self, tables: np.ndarray, seats: np.ndarray, action_bets: np.ndarray) -> np.ndarray:
+        """
+        Processes the bets that were made by the players at the seats of the tables (same as Game)
+        :returns: True for the tables where the bet was raised
+        """
+        money = self.money[tables, seats]
+        round_bet = self.round_bet[tables, seats]
+        action_bets = np.minimum(np.asarray(action_bets, dtype=np.int64), money)
+
+        # not enough to call: all-in if the player bets all the money, fold otherwise
+        fold = (round_bet + action_bets < self.current_bet[tables]) & (action_bets != money)
+        action_bets = np.where(fold, 0, action_bets)
+
+        money -= action_bets
+        round_bet += action_bets
+        self.money[tables, seats] = money
+        self.round_bet[tables, seats] = round_bet
+        self.bet[tables, seats] += action_bets
+
+        status = self.status[tables, seats]
+        status |= np.where(fold, TableState.FOLD, 0)
+        status |= np.where(~fold & (money == 0), TableState.ALL_IN, 0)
+        self.status[tables, seats] = status
+
+        raised = round_bet > self.current_bet[tables]
+        self.current_bet[tables[raised]] = round_bet[raised]
+        return raised
+
+    def _ask_policies(self, tables: np.ndarray, seats: np.ndarray) -> np.ndarray:
+        """
+        :return: the bets of the players at the seats of the tables
+        """
+        if all(policy is self.policies[0] for policy in self.policies):
+            return np.asarray(self.policies[0](BatchDecision(self, tables, seats)), dtype=np.int64)
+
+        action_bets = np.zeros(len(tables), dtype=np.int64)
+        for seat, policy in enumerate(self.policies):
+            rows = np.flatnonzero(seats == seat)
+            if len(rows):
+                action_bets[rows] = policy(BatchDecision(self, tables[rows], seats[rows]))
+
+        return action_bets
+
+    def play_round(self, tables: np.ndarray, bet_start_idx: np.ndarray) -> np.ndarray:
+        """
+        Plays betting round at the tables, every step of the loop is one step of the loop of Game.play_round()
+        at all the tables
+        :param tables: indexes of the tables
+        :param bet_start_idx: the seat of the first player to bet at every table
+        :return: the tables where the game is still going
+        """
+        playing = self.can_raise_cnt()[tables] > 1
+        betting = tables[playing]
+        current_idx = bet_start_idx[playing]
+        last_idx_raised = current_idx.copy()
+        first_flag = np.ones(len(betting), dtype=bool)
+
+        while len(betting):
+            first_flag[:] = False
+            acting = np.flatnonzero(self.status[betting, current_idx] & TableState.CANT_RAISE == 0)
+            if len(acting):
+                acting_tables = betting[acting]
+                acting_seats = current_idx[acting]
+                action_bets = self._ask_policies(acting_tables, acting_seats)
+                raised = self._action_processing(acting_tables, acting_seats, action_bets)
+                last_idx_raised[acting[raised]] = acting_seats[raised]
+
+                # IF THE FIRST PLAYER BET IS FOLD, MAKE THE NEXT PERSON THE FIRST ONE TO BET
+                first_fold = ~raised & (last_idx_raised[acting] == acting_seats) & \
+                    (self.status[acting_tables, acting_seats] & TableState.FOLD != 0)
+                first_fold = acting[first_fold]
+                last_idx_raised[first_fold] = self._next_active_seat(betting[first_fold], current_idx[first_fold])
+                first_flag[first_fold] = True
+
+            current_idx = self._next_active_seat(betting, current_idx)
+
+            going = (self.count_active_players()[betting] != 1) & (first_flag | (last_idx_raised != current_idx))
+            betting = betting[going]
+            current_idx = current_idx[going]
+            last_idx_raised = last_idx_raised[going]
+            first_flag = first_flag[going]
+
+        self.round_bet[tables] = 0
+        return tables[self.count_active_players()[tables] != 1]
+
+    def play_game(self, decks: np.ndarray = None) -> np.ndarray:
+        """
+        Plays one game at every table with more than one player in the game
+        :param decks: card ids of shape (num_tables, 5 + 2 * num_seats) for every table, random if None
+        :return: the tables that played the game
+        """
+        tables = self._tables[self.count_active_players() > 1]
+        if len(tables) == 0:
+            return tables
+
+        self.give_cards(tables, None if decks is None else np.asarray(decks)[tables])
+        self._reset(tables)
+
+        self.round_idx[tables] = 1
+        active_players = self.count_active_players()[tables]
+        dealer_idx = self.dealer_idx[tables]
+        small_blind_idx = np.where(active_players == 2, dealer_idx, self._next_active_seat(tables, dealer_idx))
+        self.current_bet[tables] = self.small_blind
+        self._action_processing(tables, small_blind_idx, np.full(len(tables), self.small_blind))
+
+        self.current_bet[tables] = self.small_blind * 2
+        big_blind_idx = self._next_active_seat(tables, small_blind_idx)
+        self._action_processing(tables, big_blind_idx, np.full(len(tables), self.small_blind * 2))
+
+        playing = self.play_round(tables, self._next_active_seat(tables, big_blind_idx))
+        for _ in range(3):
+            self.round_idx[playing] += 1
+            self.current_bet[playing] = 0
+            playing = self.play_round(playing, self._next_active_seat(playing, self.dealer_idx[playing]))
+
+        # the players still in the game show the cards
+        self.status[playing] |= np.where(
+            self.status[playing] & TableState.NOT_ACTIVE == 0, TableState.SHOWED_CARDS, 0
+        )
+
+        self.game_end(tables)
+        return tables
+
+    def hand_keys(self, tables: np.ndarray) -> np.ndarray:
+        """
+        :return: ranks of the hands of all the seats of the tables with all 5 community cards
+        """
+        board_masks = HandEvaluator.masks_from_ids(self.community_cards[tables])
+        hole_masks = HandEvaluator.masks_from_ids(self.hole_cards[tables])
+        return HandEvaluator.evaluate_hole_batch(HandEvaluator.board_state_batch(board_masks), hole_masks)
+
+    def game_end(self, tables: np.ndarray):
+        """
+        Gives the pots away at the tables exactly as Game.game_end(): the equally strong hands still in the game
+        take the smallest bet among them from every player after them, and the rest of the bets go back
+        """
+        rows = np.arange(len(tables))[:, None]
+        live = self.status[tables] & TableState.NOT_ACTIVE == 0
+        hand_keys = self.hand_keys(tables)
+        bet = self.bet[tables]
+        money = self.money[tables]
+
+        # the same order as SidePots.order() (descending and stable)
+        seats = np.broadcast_to(np.arange(self.num_seats), bet.shape)
+        order = np.lexsort((seats, -bet, -hand_keys, ~live), axis=1)
+        live = live[rows, order]
+        hand_keys = hand_keys[rows, order]
+        bet = bet[rows, order]
+        money = money[rows, order]
+
+        # groups of the equally strong hands still in the game, the players not in the game are in no group
+        new_group = np.ones(bet.shape, dtype=bool)
+        new_group[:, 1:] = hand_keys[:, 1:] != hand_keys[:, :-1]
+        group_idx = np.where(live, np.cumsum(new_group, axis=1) - 1, self.num_seats)
+
+        positions = np.arange(self.num_seats)
+        for group in range(self.num_seats):
+            members = group_idx == group
+            num_members = np.count_nonzero(members, axis=1)
+            if not num_members.any():
+                break
+
+            # smallest bet among the equally strong hands is the bet of the last player of the group
+            last = np.where(num_members > 0, np.argmax(positions * members, axis=1), self.num_seats)
+            get_bet = np.where(num_members > 0, bet[rows[:, 0], np.minimum(last, self.num_seats - 1)], 0)
+
+            later = positions > last[:, None]
+            taken = np.where(later, np.minimum(bet, get_bet[:, None]), 0)
+            total_gain = taken.sum(axis=1)
+            bet = np.where(later, np.maximum(0, bet - get_bet[:, None]), bet)
+
+            m = np.maximum(num_members, 1)
+            first = np.argmax(members, axis=1)
+            money += np.where(members, (total_gain // m)[:, None], 0)
+            money += members & (positions < (first + total_gain % m)[:, None])
+
+        final_money = np.empty_like(money)
+        final_money[rows, order] = money + bet
+        self.money[tables] = final_money
+
+        self._reset(tables)
+        self.dealer_idx[tables] = self._next_active_seat(tables, self.dealer_idx[tables])
+        self.game_idx[tables] += 1
+        self.round_idx[tables] = 0
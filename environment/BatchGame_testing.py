@@ -0,0 +1,115 @@
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from poker.environment.BatchGame import BatchGame
+from poker.environment.Card import Card
+from poker.environment.Game import Game
+from poker.Players.PlayerBase import PlayerBase
+
+"""
+Differential check of BatchGame against Game: the tables of both engines get the same cards and
+the players make the same scripted bets, so the money of every seat must be the same after every game
+"""
+
+
+def scripted_bet(table, game_idx, round_idx, seat, current_bet, round_bet, money, card1, card2):
+    """
+    Deterministic bet from the state the player sees. Works both for numbers (Game) and for arrays (BatchGame)
+    """
+    h = (table * 7919 + game_idx * 104729 + round_idx * 31 + seat * 17 + current_bet * 13 + round_bet * 7
+         + money * 3 + card1 * 5 + card2 * 11) % 100
+    call = current_bet - round_bet
+    return np.select(
+        [h < 12, h < 55, h < 80, h < 90, h < 94, h < 97],
+        [-1, call, call + 2 + h % 7, call + money // 3, call - 1, money],
+        money + 1
+    )
+
+
+class ScriptedPlayer(PlayerBase):
+    def __init__(self, table: int, seat: int):
+        super().__init__()
+        self.table = table
+        self.seat = seat
+
+    def needs_broadcast(self):
+        return False
+
+    def action(self):
+        card1, card2 = (card.id for card in self.player_profile.cards)
+        return int(scripted_bet(
+            self.table, self.game_info.game_idx, self.game_info.round_idx, self.seat, self.game_info.current_bet,
+            self.player_profile.current_round_bet, self.player_profile.money, card1, card2
+        ))
+
+
+class DeckGame(Game):
+    """Game that deals the given decks instead of the random cards"""
+
+    def __init__(self, decks: np.ndarray, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decks = decks
+
+    def give_cards(self):
+        drawn_cards = [Card.from_id(card_id) for card_id in self.decks[self.game_idx].tolist()]
+        self.community_cards = drawn_cards[:5]
+        self.shown_community_cards = []
+
+        for i in range(self.num_players):
+            self.players_profiles[self.players_ids[i]].cards = drawn_cards[5 + 2 * i: 5 + 2 * (i + 1)]
+
+
+def batch_policy(decision):
+    card1, card2 = decision.hole_cards[:, 0], decision.hole_cards[:, 1]
+    return scripted_bet(
+        decision.tables, decision.game_idx, decision.round_idx, decision.seats, decision.current_bet,
+        decision.player_round_bet(), decision.player_money(), card1, card2
+    )
+
+
+def check(num_tables: int, num_seats: int, num_games: int, start_value: int, small_blind: int, seed: int):
+    rng = np.random.default_rng(seed)
+    num_drawn_cards = 5 + 2 * num_seats
+    # decks[game_idx, table]
+    decks = np.argsort(rng.random((num_games, num_tables, 52)), axis=2)[:, :, :num_drawn_cards]
+
+    games = [
+        DeckGame(decks[:, table], [ScriptedPlayer(table, seat) for seat in range(num_seats)], start_value,
+                 small_blind)
+        for table in range(num_tables)
+    ]
+    batch_game = BatchGame(num_tables, num_seats, start_value, small_blind, batch_policy)
+
+    start = perf_counter()
+    for game_idx in range(num_games):
+        for game in games:
+            if game.count_active_players() > 1:
+                game.play_game()
+    game_time = perf_counter() - start
+
+    start = perf_counter()
+    for game_idx in range(num_games):
+        # the tables only play while more than one player has money, so every table has its own game_idx
+        batch_game.play_game(decks[batch_game.game_idx % num_games, np.arange(num_tables)])
+    batch_time = perf_counter() - start
+
+    game_money = np.array([game.table.money for game in games])
+    mismatches = np.flatnonzero((game_money != batch_game.money).any(axis=1))
+    print(f"{num_tables} tables, {num_seats} seats, {num_games} games: {len(mismatches)} mismatches, "
+          f"Game {game_time:.2f} s, BatchGame {batch_time:.2f} s")
+    for table in mismatches[:5]:
+        print(f"    table {table}: Game {game_money[table].tolist()}, BatchGame {batch_game.money[table].tolist()}")
+
+    return len(mismatches) == 0
+
+
+if __name__ == '__main__':
+    num_tables = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    ok = True
+    for num_seats, start_value, small_blind in [(2, 100, 2), (3, 100, 5), (6, 200, 5), (9, 100, 2)]:
+        ok &= check(num_tables, num_seats, 30, start_value, small_blind, seed=num_seats)
+
+    print("ALL TESTS PASSED" if ok else "MISMATCHES FOUND")
@@ -1,4 +1,7 @@
-from copy import deepcopy
+from array import array
+import numpy as np
+from .HandEvaluator import HandEvaluator
+from .HandRankTable import HandRankTable
 
 
 class Card:
@@ -45,36 +48,94 @@ class Card:
         "d": 13
     }
 
+    # suits and pips in the order of the card ids (see HandEvaluator)
+    SUITS = "HDCS"
+    PIPS = "23456789abcd1"
+
+    # precomputed rank (0 is 2, 12 is ace) and suit (0 is hearts, 3 is spades) of every card id
+    RANK_OF = array("B", [card_id % 13 for card_id in range(52)])
+    SUIT_OF = array("B", [card_id // 13 for card_id in range(52)])
+
+    # mask of the whole deck
+    DECK_MASK = (1 << 52) - 1
+
+    # the only 52 instances of the card. Filled right after the class definition
+    _cards = {}
+    _cards_by_id = ()
+    # all cards in the order returned by all_possible_cards()
+    _all_cards = ()
+
+    __slots__ = ("val", "id", "rank", "suit", "mask")
+
     """
     clubs, diamonds, hearts and spades \n
     Card is the wrapper around the string of length 2, where the first character is the suite and the second is pip # in hex \n
-    Examples: C1 (clubs Ace), HB (hearts jack) S5 (5 of spades)
-    The Card is immutable
+    Examples: C1 (clubs Ace), HB (hearts jack) S5 (5 of spades) \n
+    The Card is immutable and interned: there are exactly 52 instances, one for each card, so Card("H2") is Card("H2")
+    (only the cards unpickled from the files saved before the interning are equal copies of them).
+    Every card also has an integer id from 0 to 51 (13 * suit + rank), its rank, suit and a bit mask 1 << id,
+    so that a hand or a deck can be stored as a single int (see to_mask()) or array('B') of ids (see to_array())
     """
 
-    def __init__(self, val):
+    def __new__(cls, val=None):
         """
-        Initialize card
+        Returns the card
         :param val: the value in the form of 2 char string
         """
-        if len(val) != 2 or val[0] not in Card._char_to_string or val[1] not in Card._char_to_string:
-            raise ValueError("Impossible value passed")
+        card = Card._cards.get(val)
+        if card is not None:
+            return card
+
+        # unpickling of the cards saved before the cards were interned, the state is set by __setstate__.
+        # The unpickler calls __new__ without __init__, Card() is rejected by __init__
+        if val is None:
+            return object.__new__(cls)
+
+        raise ValueError("Impossible value passed")
+
+    def __init__(self, val=None):
+        if val is None:
+            raise ValueError("Card value must be passed")
 
-        self.val = val
+    @staticmethod
+    def _create(val: str) -> "Card":
+        """Creates the shared instance of the card. Should only be called once for every card"""
+        card = object.__new__(Card)
+        card_id = Card.SUITS.index(val[0]) * 13 + Card.PIPS.index(val[1])
+        object.__setattr__(card, "val", val)
+        object.__setattr__(card, "id", card_id)
+        object.__setattr__(card, "rank", Card.RANK_OF[card_id])
+        object.__setattr__(card, "suit", Card.SUIT_OF[card_id])
+        object.__setattr__(card, "mask", 1 << card_id)
+        return card
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Card is immutable")
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            # (dict state, slots state)
+            state = state[0] or state[1]
+        card = Card._cards[state["val"]]
+        for key in Card.__slots__:
+            object.__setattr__(self, key, getattr(card, key))
+
+    def __reduce__(self):
+        return Card, (self.val,)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def less_than_by_one(self, card: "Card") -> bool:
         """
         :param card: the card to compare this card with
         :return: if the next card is less than the current card returns True, otherwise returns False
         """
-
-        if card.val[1] == "d" and self.val[1] == "1":
-            return True
-        if card.val[1] == "9" and self.val[1] == "a":
-            return True
-        if ord(self.val[1]) - ord(card.val[1]) == 1:
-            return True
-        return False
+        # ace is also less than 2
+        return (card.rank + 1) % 13 == self.rank
 
     def greater_than_by_one(self, card: "Card") -> bool:
         """
@@ -84,31 +145,77 @@ class Card:
         return card.less_than_by_one(self)
 
     def same_suit(self, card: "Card") -> bool:
-        return self.val[0] == card.val[0]
+        return self.suit == card.suit
 
     def get_pips(self) -> int:
         """
         :return: pips value
         """
-        return Card._pips_to_value[self.val[1]]
+        return self.rank + 2
 
     def same_pips(self, card: "Card") -> bool:
         """
         :param card:
         :return: True if has same pips, False otherwise
         """
-        return self.val[1] == card.val[1]
+        return self.rank == card.rank
 
     @staticmethod
     def all_possible_cards() -> list:
-        ans = []
+        return list(Card._all_cards)
+
+    @staticmethod
+    def deck() -> tuple:
+        """
+        :return: shared tuple of all cards (in the same order as all_possible_cards()), must not be modified
+        """
+        return Card._all_cards
+
+    @staticmethod
+    def from_id(card_id: int) -> "Card":
+        return Card._cards_by_id[card_id]
 
-        for suit in Card._suit_to_value:
-            for pips in Card._pips_to_value:
-                card = Card(suit + pips)
-                ans.append(card)
+    @staticmethod
+    def to_mask(cards) -> int:
+        """
+        :param cards: iterable of cards
+        :return: mask of the cards
+        """
+        mask = 0
+        for card in cards:
+            mask |= card.mask
+        return mask
+
+    @staticmethod
+    def from_mask(mask: int) -> list:
+        """
+        :param mask: mask of the cards
+        :return: list of the cards in the order of their ids
+        """
+        cards_by_id = Card._cards_by_id
+        cards = []
+        while mask:
+            low_bit = mask & -mask
+            cards.append(cards_by_id[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return cards
+
+    @staticmethod
+    def to_array(cards) -> array:
+        """
+        :param cards: iterable of cards
+        :return: array('B') of the card ids
+        """
+        return array("B", [card.id for card in cards])
 
-        return ans
+    @staticmethod
+    def from_array(card_ids) -> list:
+        """
+        :param card_ids: iterable of the card ids (e.g. array('B'))
+        :return: list of the cards
+        """
+        cards_by_id = Card._cards_by_id
+        return [cards_by_id[card_id] for card_id in card_ids]
 
     def __str__(self):
         return Card._char_to_string[self.val[0]] + Card._char_to_string[self.val[1]]
@@ -117,51 +224,26 @@ class Card:
         return str(self)
 
     def __eq__(self, other):
-        return self.val == other.val
+        return self is other or isinstance(other, Card) and self.id == other.id
 
     def get_card_id(self):
-        n = (Card._suit_to_value[self.val[0]] - 1) * 13 + Card._pips_to_value[self.val[1]]
+        n = self.suit * 13 + self.rank + 2
         return n
 
     def __hash__(self):
-        return hash(self.val)
+        return self.id
+
+
+Card._cards_by_id = tuple(Card._create(suit + pips) for suit in Card.SUITS for pips in Card.PIPS)
+Card._cards = {card.val: card for card in Card._cards_by_id}
+Card._all_cards = tuple(Card._cards[suit + pips] for suit in Card._suit_to_value for pips in Card._pips_to_value)
+
 
 class CombinationFinder:
     """
     Set of functions to find combinations
     """
 
-    @staticmethod
-    def _path_finder(cards: list, bitmask: int, current_card_idx: int, *args) -> int:
-        """
-        Finds the maximum length of the path between cards, that return true in the card methods \n
-        Note that if initial current_card_idx is not 0, the path length returned is 1 less than the actual one.
-        :param cards:
-        :param bitmask: 1 if the card wasn't used, 0 if it was
-        :param args: boolean methods of cards, that connect two cards if they return true
-        :param current_card_idx: the index of the card that is currently a "node"
-        :return: length of the maximum path possible
-        """
-        ans = 0
-        for i in range(len(cards)):
-            if current_card_idx == -1:
-                ans = max(ans, CombinationFinder._path_finder(cards, bitmask ^ (1 << i), i, *args) + 1)
-
-            # card wasn't selected before
-            elif bitmask & (1 << i):
-                cur_card = cards[current_card_idx]
-                next_card = cards[i]
-                flag = True
-
-                # check that all conditions apply
-                for arg in args:
-                    flag = flag and arg(cur_card, next_card)
-
-                if flag:
-                    ans = max(ans, CombinationFinder._path_finder(cards, bitmask ^ (1 << i), i, *args) + 1)
-
-        return ans
-
     """
     PRIORITY OF COMBINATIONS:
     Royal Flush
@@ -176,323 +258,114 @@ class CombinationFinder:
     High Card
     """
 
+    @staticmethod
+    def _is_combination(cards: list, category: int) -> bool:
+        """
+        :return: True if the best combination of the cards is of the category (one of HandEvaluator categories)
+        """
+        return HandEvaluator.category(CombinationFinder.hand_key(cards)) == category
+
     @staticmethod
     def has_royal_flush(cards: list) -> bool:
-        for i in range(len(cards)):
-            if cards[i].val[1] == "a" \
-                    and CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, Card.same_suit,
-                                                       Card.greater_than_by_one) + 1 >= 5:
-                return True
-        return False
+        return CombinationFinder._is_combination(cards, HandEvaluator.ROYAL_FLUSH)
 
     @staticmethod
     def has_straight_flush(cards: list) -> bool:
-        return CombinationFinder.has_flush(cards) and CombinationFinder.has_straight(cards)
+        return CombinationFinder._is_combination(cards, HandEvaluator.STRAIGHT_FLUSH)
 
     @staticmethod
     def has_four_of_a_kind(cards: list) -> bool:
-        return CombinationFinder._path_finder(cards, (1 << len(cards)) - 1, -1, Card.same_pips) == 4
+        return CombinationFinder._is_combination(cards, HandEvaluator.FOUR_OF_A_KIND)
 
     @staticmethod
     def has_full_house(cards: list) -> bool:
-        a = 0
-        b = 0
-        for i in range(len(cards)):
-            if CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, Card.same_pips) + 1 >= 3:
-                a += 1
-                b += 1
-            elif CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, Card.same_pips) + 1 >= 2:
-                b += 1
-        if a > 3 or a == 3 and b >= 5:
-            return True
-        return False
+        return CombinationFinder._is_combination(cards, HandEvaluator.FULL_HOUSE)
 
     @staticmethod
     def has_flush(cards: list) -> bool:
-        a = CombinationFinder._path_finder(cards, (1 << len(cards)) - 1, -1, Card.same_suit)
-        return a >= 5
+        return CombinationFinder._is_combination(cards, HandEvaluator.FLUSH)
 
     @staticmethod
     def has_straight(cards: list) -> bool:
-        for i in range(len(cards)):
-            pips = cards[i].get_pips()
-            if (pips <= 10 or pips == 14) and CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, Card.greater_than_by_one) + 1 >= 5:
-                return True
-        return False
+        return CombinationFinder._is_combination(cards, HandEvaluator.STRAIGHT)
 
     @staticmethod
     def has_three_of_a_kind(cards: list) -> bool:
-        return CombinationFinder._path_finder(cards, (1 << len(cards)) - 1, -1, Card.same_pips) == 3
+        return CombinationFinder._is_combination(cards, HandEvaluator.THREE_OF_A_KIND)
 
     @staticmethod
     def has_two_pairs(cards: list) -> bool:
-        a = 0
-        for i in range(len(cards)):
-            if CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, Card.same_pips) + 1 >= 2:
-                a += 1
-        return a >= 4
+        return CombinationFinder._is_combination(cards, HandEvaluator.TWO_PAIRS)
 
     @staticmethod
     def has_pair(cards: list) -> bool:
-        return CombinationFinder._path_finder(cards, (1 << len(cards)) - 1, -1, Card.same_pips) == 2
+        return CombinationFinder._is_combination(cards, HandEvaluator.PAIR)
 
     @staticmethod
-    def combination_determiner(cards: list) -> int:
-        if CombinationFinder.has_royal_flush(cards):
-            return 10
-        if CombinationFinder.has_straight_flush(cards):
-            return 9
-        if CombinationFinder.has_four_of_a_kind(cards):
-            return 8
-        if CombinationFinder.has_full_house(cards):
-            return 7
-        if CombinationFinder.has_flush(cards):
-            return 6
-        if CombinationFinder.has_straight(cards):
-            return 5
-        if CombinationFinder.has_three_of_a_kind(cards):
-            return 4
-        if CombinationFinder.has_two_pairs(cards):
-            return 3
-        if CombinationFinder.has_pair(cards):
-            return 2
-        return 1
-
-
-    @staticmethod
-    def combination_comparator(cards1: list, cards2: list):
+    def hand_key(cards: list) -> int:
         """
-        Returns positive number if the first list of cards is stronger than the second list of cards,
-        negative if weaker and 0 if they are equally strong.\n
-        Lists of cards won't be modified
-        :param cards1: first list of coards to compare
-        :param cards2: second list of coards to compare
-        :return: positive, negative or 0
+        Ranks the cards with the table driven HandEvaluator. HandRankTable is not used here: for a single hand
+        its lookup is not faster than the evaluator (see evaluate_batch())
+        :param cards: list of 5, 6 or 7 cards
+        :return: key of the best combination: category and all kickers in one integer.
+        The stronger the combination the greater the key, equally strong combinations have equal keys
         """
+        mask = 0
+        for card in cards:
+            mask |= card.mask
 
-        strength1 = CombinationFinder.combination_determiner(cards1)
-        strength2 = CombinationFinder.combination_determiner(cards2)
-        dif = strength1 - strength2
-        if dif != 0:
-            return dif
-
-        cards1 = deepcopy(cards1)
-        cards2 = deepcopy(cards2)
-
-        cards1.sort(key=lambda card: card.get_pips(), reverse=True)
-        cards2.sort(key=lambda card: card.get_pips(), reverse=True)
-
-        method = CombinationFinder.tiebreakers[strength1]
-
-        return method(cards1, cards2)
-
+        return HandEvaluator.evaluate(mask)
 
     @staticmethod
-    def _highest_card_finder_by_combination(cards: list, length: int, *args):
+    def board_state(community_cards: list) -> tuple:
         """
-        Finds the highest cards in the combination (path)
-        :return: The pips value
+        Analyzes the community cards once for hand_key_with_board()
+        :param community_cards: list of 3, 4 or 5 cards
+        :return: state of the board
         """
-
-        for i in range(len(cards)):
-            if CombinationFinder._path_finder(cards, ((1 << len(cards)) - 1) ^ (1 << i), i, *args) + 1 >= length:
-                return cards[i].get_pips()
-
-        return -1
-
-
-    @staticmethod
-    def royal_flush_tiebreaker(cards1: list, cards2: list):
-        """
-        Royal Flush has no tiebreaker, the values are equal
-        :return: 0
-        """
-        return 0
-
-
-
-    @staticmethod
-    def straight_flush_tiebreaker(cards1: list, cards2: list):
-        """
-        Has no kicker. Straight with the highest card wins
-        """
-        a1 = CombinationFinder._highest_card_finder_by_combination(cards1, 5, Card.less_than_by_one, Card.same_suit)
-        a2 = CombinationFinder._highest_card_finder_by_combination(cards2, 5, Card.less_than_by_one, Card.same_suit)
-
-        return a1 - a2
-
-    @staticmethod
-    def four_of_kind_tiebreaker(cards1: list, cards2: list):
-        """
-        Determines by kicker if two four_of_kind are the same
-        """
-        a1 = CombinationFinder._highest_card_finder_by_combination(cards1, 4, Card.same_pips)
-        a2 = CombinationFinder._highest_card_finder_by_combination(cards2, 4, Card.same_pips)
-
-        if a1 != a2:
-            return a1 - a2
-
-        return CombinationFinder.highest_card_tiebreaker(cards1, cards2)
-
-    @staticmethod
-    def full_house_tiebreaker(cards1: list, cards2: list):
-        """
-        No kicker. Firstly compare trips, then compare pairs
-        """
-        a1 = {i: 0 for i in Card._pips_to_value.values()}
-        a2 = {i: 0 for i in Card._pips_to_value.values()}
-
-        for i in range(len(cards1)):
-            a1[cards1[i].get_pips()] += 1
-        for i in range(len(cards2)):
-            a2[cards2[i].get_pips()] += 1
-
-        pips = list(Card._pips_to_value.values())
-        pips.sort(reverse=True)
-        pip3 = -1
-
-        for pip in pips:
-            if a1[pip] == 3 and a2[pip] != 3:
-                return 1
-
-            if a2[pip] == 3 and a1[pip] != 3:
-                return -1
-
-            if a1[pip] == a2[pip] == 3:
-                pip3 = pip
-                break
-
-        for pip in pips:
-            if pip != pip3 and a1[pip] >= 2 > a2[pip]:
-                return 1
-            if pip != pip3 and a1[pip] < 2 <= a2[pip]:
-                return -1
-            if pip != pip3 and a1[pip] >= 2 and a2[pip] >= 2:
-                return 0
-
-        return 0
-
-    @staticmethod
-    def flush_tiebreaker(cards1: list, cards2: list):
-        """
-        Comparing cards in the flush. No use of kicker
-        """
-        suit1 = ""
-        suit2 = ""
-
-        for i in range(len(cards1)):
-            if CombinationFinder._path_finder(cards1, ((1 << len(cards1)) - 1) ^ (1 << i), i, Card.same_suit) + 1 >= 5:
-                suit1 = cards1[i].val[0]
-                break
-
-        for i in range(len(cards2)):
-            if CombinationFinder._path_finder(cards2, ((1 << len(cards2)) - 1) ^ (1 << i), i, Card.same_suit) + 1 >= 5:
-                suit2 = cards2[i].val[0]
-                break
-
-        suit_cards1 = []
-        suit_cards2 = []
-
-        for i in range(len(cards1)):
-            if cards1[i].val[0] == suit1:
-                suit_cards1.append(cards1[i])
-
-        for i in range(len(cards2)):
-            if cards2[i].val[0] == suit2:
-                suit_cards2.append(cards2[i])
-
-        for i in range(5):
-            if suit_cards1[i].get_pips() != suit_cards2[i].get_pips():
-                return suit_cards1[i].get_pips() - suit_cards2[i].get_pips()
-
-        return 0
+        return HandEvaluator.board_state(Card.to_mask(community_cards))
 
     @staticmethod
-    def straight_tiebreaker(cards1: list, cards2: list):
+    def hand_key_with_board(board_state: tuple, hole_cards: list) -> int:
         """
-        Has no kicker. Straight with the highest card wins
+        Same as hand_key(hole_cards + community_cards), but only the hole cards are analyzed
+        :param board_state: state returned by board_state()
+        :param hole_cards: list of 2 cards
+        :return: key of the best combination
         """
-        a1 = CombinationFinder._highest_card_finder_by_combination(cards1, 5, Card.less_than_by_one)
-        a2 = CombinationFinder._highest_card_finder_by_combination(cards2, 5, Card.less_than_by_one)
-
-        return a1 - a2
+        return HandEvaluator.evaluate_hole(board_state, Card.to_mask(hole_cards))
 
     @staticmethod
-    def three_of_kind_tiebreaker(cards1: list, cards2: list):
+    def evaluate_batch(cards: np.ndarray) -> np.ndarray:
         """
-        Highest 3 of kind. Has kicker
+        Ranks the whole matrix of hands in one vectorized pass
+        (with the precomputed HandRankTable for 7 cards, if its file was generated)
+        :param cards: integer array of shape (N, 7) of the card ids (Card.id). 5 or 6 columns are also allowed
+        :return: int64 array of shape (N,) of the ranks, the stronger the combination the greater the rank
         """
-        a1 = CombinationFinder._highest_card_finder_by_combination(cards1, 3, Card.same_pips)
-        a2 = CombinationFinder._highest_card_finder_by_combination(cards2, 3, Card.same_pips)
+        table = HandRankTable.get()
+        if table is not None and np.shape(cards)[-1] == HandRankTable.NUM_CARDS:
+            return table.lookup_batch(cards)
 
-        if a1 != a2:
-            return a1 - a2
-
-        return CombinationFinder.highest_card_tiebreaker(cards1, cards2)
+        return HandEvaluator.evaluate_batch(cards)
 
     @staticmethod
-    def two_pairs_tiebreaker(cards1: list, cards2: list):
-        """
-        Highest pair win. Has a kicker
-        """
-        a1 = {i: 0 for i in Card._pips_to_value.values()}
-        a2 = {i: 0 for i in Card._pips_to_value.values()}
-
-        for i in range(len(cards1)):
-            a1[cards1[i].get_pips()] += 1
-        for i in range(len(cards2)):
-            a2[cards2[i].get_pips()] += 1
-
-        pips = list(Card._pips_to_value.values())
-        pips.sort(reverse=True)
-
-        cnt = 0
-        for pip in pips:
-            if a1[pip] == 2 and a2[pip] != 2:
-                return 1
-            if a1[pip] != 2 and a2[pip] == 2:
-                return -1
-            if a1[pip] == 2 == a2[pip]:
-                cnt += 1
-                if cnt == 2:
-                    break
-
-        return CombinationFinder.highest_card_tiebreaker(cards1, cards2)
-
-    @staticmethod
-    def pair_tiebreaker(cards1: list, cards2: list):
-        a1 = CombinationFinder._highest_card_finder_by_combination(cards1, 2, Card.same_pips)
-        a2 = CombinationFinder._highest_card_finder_by_combination(cards2, 2, Card.same_pips)
-
-        if a1 != a2:
-            return a1 - a2
+    def combination_determiner(cards: list) -> int:
+        return HandEvaluator.category(CombinationFinder.hand_key(cards))
 
-        return CombinationFinder.highest_card_tiebreaker(cards1, cards2)
 
     @staticmethod
-    def highest_card_tiebreaker(cards1: list, cards2: list):
+    def combination_comparator(cards1: list, cards2: list):
         """
-        Kicker
+        Returns positive number if the first list of cards is stronger than the second list of cards,
+        negative if weaker and 0 if they are equally strong.\n
+        Lists of cards won't be modified
+        :param cards1: first list of coards to compare
+        :param cards2: second list of coards to compare
+        :return: positive, negative or 0
         """
-        for i in range(len(cards1)):
-            if cards1[i].get_pips() != cards2[i].get_pips():
-                return cards1[i].get_pips() - cards2[i].get_pips()
 
-        return 0
-
-    tiebreakers = {
-        10: royal_flush_tiebreaker,
-        9: straight_tiebreaker,
-        8: four_of_kind_tiebreaker,
-        7: full_house_tiebreaker,
-        6: flush_tiebreaker,
-        5: straight_tiebreaker,
-        4: three_of_kind_tiebreaker,
-        3: two_pairs_tiebreaker,
-        2: pair_tiebreaker,
-        1: highest_card_tiebreaker,
-
-    }
+        return CombinationFinder.hand_key(cards1) - CombinationFinder.hand_key(cards2)
 
 
 if __name__ == "__main__":
@@ -520,7 +393,7 @@ if __name__ == "__main__":
 
     tests = [
         [["H2", "H1", "Hd", "Hc", "Hb", "Ha", "S4"], ["H2", "S1", "Sd", "Sc", "Sb", "Sa", "C4"]],   # print 0
-        [["S1", "D2", "C2", "C1", "H1", "C3", "H2"], ["H3", "C3", "C2", "D2", "H2", "D1", "Dd"]],   # print 1
+        [["S1", "D2", "C2", "C1", "H1", "C3", "H2"], ["H3", "C3", "C2", "D2", "H2", "D1", "Dd"]],   # print positive number
         [["Sa", "H2", "H3", "H4", "H5", "D7", "Ca"], ["Hb", "D4", "H7", "Sd", "C8", "D6", "C5"]],   # print negative number
     ]
 
@@ -1,11 +1,18 @@
 import uuid
 from .Card import Card, CombinationFinder
-from random import sample
+from .TableState import TableState
+from .GameEvents import GameStarted, BlindPosted, Action, StreetDealt, Showdown, GameEnded
+from .HandHistory import HandHistoryRecorder
+from .SidePots import SidePots
+from .GameStats import GameStats
+import random
+from hashlib import blake2b
+from time import perf_counter
 from uuid import uuid4
 from copy import deepcopy
-from functools import cmp_to_key
 import logging
-from poker.Players.PlayerProfile import PlayerProfile
+from collections import namedtuple
+from poker.Players.PlayerProfile import PlayerProfileSnapshot
 
 
 class GameInfo:
@@ -42,12 +49,66 @@ class GameInfo:
         return s
 
 
+class FrozenDict(dict):
+    """
+    Read-only dictionary. Used for the players profiles of GameInfoSnapshot, which are shared by all the players
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrozenDict is read-only")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __deepcopy__(self, memo):
+        return FrozenDict(deepcopy(dict(self), memo))
+
+
+class GameInfoSnapshot(GameInfo):
+    """
+    Read-only GameInfo. One snapshot is shared by all the players instead of copying the information for every one
+    of them: its players profiles are PlayerProfileSnapshot in a FrozenDict, the cards and ids are tuples
+    """
+    def __init__(self, **values):
+        """
+        :param values: values of all the fields of GameInfo
+        """
+        self.__dict__.update(values)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("GameInfoSnapshot is read-only")
+
+    def __delattr__(self, key):
+        raise AttributeError("GameInfoSnapshot is read-only")
+
+
+class GameState(namedtuple("GameState", ["table", "dealer_idx", "game_idx", "round_idx", "current_round_bet",
+                                         "community_cards", "shown_community_cards", "hand_seed"])):
+    """
+    Compact copy of the state of the game (see Game.snapshot()): the values of the seats (TableState.snapshot()),
+    the bets and the cards. The players and their agents are not a part of it
+    """
+    __slots__ = ()
+
+
 class Game:
     logger = logging.getLogger("Game")
     logger.setLevel(logging.WARNING)
 
 
-    def __init__(self, players: list, start_value: int, small_blind: int):
+    def __init__(self, players: list, start_value: int, small_blind: int, hand_history=None, seed: int = None,
+                 rng: random.Random = None, stats: GameStats = None):
+        """
+        :param players: players at the table
+        :param start_value: initial amount of money of every player
+        :param small_blind: small blind
+        :param hand_history: HandHistoryWriter to record every played hand with, no recording if None
+        :param seed: seed of the table. The cards of every game are dealt from the seed of the game derived from
+        the seed of the table and the index of the game (see seed_of_hand()), so any game can be dealt again
+        :param rng: generator of the cards if the seed is None, the functions of the random module if None
+        :param stats: GameStats to collect the counters and the timers of the game in, nothing is measured if None
+        """
         self.num_players = len(players)
         # number of players that are still in the round
         self.num_active_players = self.num_players
@@ -63,71 +124,172 @@ class Game:
 
         # Leaving players empty for a while
         self.players_ids = [uuid4() for _ in range(self.num_players)]
-        self.players_profiles = {
-            self.players_ids[i]: PlayerProfile(start_value, self.players_ids[i])
-            for i in range(self.num_players)
-        }
+        # the profiles are the views of the seats of the table state
+        self.table = TableState(self.players_ids, start_value)
+        self.players_profiles = dict(zip(self.players_ids, self.table.views))
+        self.players_seats = {player_id: i for i, player_id in enumerate(self.players_ids)}
         # self.players = [PlayerBase(deepcopy(self.players_profiles[self.players_ids[i]])) for i in range(num_players)]
         self.players = players
         for i in range(self.num_players):
             player_id = self.players_ids[i]
-            self.players[i].update_player_profile(deepcopy(self.players_profiles[player_id]))
+            self.players[i].update_player_profile(PlayerProfileSnapshot(self.players_profiles[player_id]))
 
         self.community_cards = []
         self.shown_community_cards = []
         self.current_round_bet = 0
 
-    def _create_game_info(self) -> GameInfo:
+        self.seed = seed
+        self.rng = rng
+        # seed the cards of the current game were dealt from, None if the table has no seed
+        self.hand_seed = None
+
+        # counters and timers of the game (can be set at any time), None if the game is not measured
+        self.stats = stats
+
+        # observers of the game events (see subscribe())
+        self.observers = []
+        if hand_history is not None:
+            self.subscribe(HandHistoryRecorder(self, hand_history))
+
+    def snapshot(self) -> GameState:
+        """
+        Copies the state of the game in O(number of players), e.g. to explore the other actions and go back
+        with restore(). The position of the betting round (whose turn it is) is known to the caller
+        """
+        return GameState(
+            self.table.snapshot(), self.dealer_idx, self.game_idx, self.round_idx, self.current_round_bet,
+            tuple(self.community_cards), tuple(self.shown_community_cards), self.hand_seed
+        )
+
+    def restore(self, state: GameState):
+        """
+        Sets the state of the game back to the snapshot
+        :param state: value returned by snapshot()
+        """
+        self.table.restore(state.table)
+        self.dealer_idx = state.dealer_idx
+        self.game_idx = state.game_idx
+        self.round_idx = state.round_idx
+        self.current_round_bet = state.current_round_bet
+        self.community_cards = list(state.community_cards)
+        self.shown_community_cards = list(state.shown_community_cards)
+        self.hand_seed = state.hand_seed
+
+    def subscribe(self, observer):
+        """
+        Subscribes the observer to the events of the game (see GameEvents)
+        :param observer: GameObserver, its on_event() is called for every event
+        """
+        self.observers.append(observer)
+
+    def unsubscribe(self, observer):
+        """Stops passing the events to the observer"""
+        self.observers.remove(observer)
+
+    def _notify(self, event):
+        """Passes the event to all the observers"""
+        for observer in self.observers:
+            observer.on_event(event)
+
+    def _create_game_info(self, hide_cards: bool = False) -> GameInfo:
         """
         Creates GameInfo of the current game
-        :return: game information class
+        :param hide_cards: if True, the cards of the players that didn't show them are hidden
+        :return: read-only snapshot of the game information
         """
+        players_profiles = FrozenDict({
+            player_id: PlayerProfileSnapshot(player_profile, hide_cards and not player_profile.showed_cards)
+            for player_id, player_profile in self.players_profiles.items()
+        })
 
-        game_info = GameInfo()
-        game_info.num_players = self.num_players
-        game_info.small_blind = self.small_blind
-        game_info.dealer_idx = self.dealer_idx
-        game_info.players_profiles = self.players_profiles
-        game_info.shown_community_cards = self.shown_community_cards
-        game_info.current_bet = self.current_round_bet
-        game_info.players_ids = self.players_ids
-        game_info.game_idx = self.game_idx
-        game_info.round_idx = self.round_idx
+        return GameInfoSnapshot(
+            small_blind=self.small_blind,
+            num_players=self.num_players,
+            dealer_idx=self.dealer_idx,
+            players_profiles=players_profiles,
+            shown_community_cards=tuple(self.shown_community_cards),
+            current_bet=self.current_round_bet,
+            players_ids=tuple(self.players_ids),
+            game_idx=self.game_idx,
+            round_idx=self.round_idx
+        )
 
-        return deepcopy(game_info)
 
 
 
+    def _log_game_info(self, msg: str, *args):
+        """
+        Logs the message and the game information at the debug level. Nothing is formatted (and the game information
+        is not even created) if the debug level is disabled
+        :param msg: message in the format of logging (%-style), args are its arguments
+        """
+        if Game.logger.isEnabledFor(logging.DEBUG):
+            Game.logger.debug(msg + "\n%s", *args, self._create_game_info())
 
-    def provide_game_info(self, verbose=False):
+    def provide_game_info(self, verbose=False, players_idx=None):
         """
-        Provides information about the game to the players
+        Provides information about the game to the players. By default only to the players that need it after every
+        change (see PlayerBase.needs_broadcast()), the others get it right before their action and in the end
+        of the game
+        :param verbose: return the information
+        :param players_idx: indexes of the players to provide the information to
         """
+        if players_idx is None:
+            players_idx = [i for i in range(self.num_players) if self.players[i].needs_broadcast()]
+        if not players_idx and not verbose:
+            return
 
-        game_info = self._create_game_info()
-        for i in range(self.num_players):
+        stats = self.stats
+        if stats is not None:
+            start = perf_counter()
+
+        # one snapshot is shared by all the players, nobody sees the cards that were not shown
+        game_info = self._create_game_info(hide_cards=True)
+        for i in players_idx:
             player = self.players[i]
             player_id = self.players_ids[i]
+            player.update_player_profile(PlayerProfileSnapshot(self.players_profiles[player_id]))
+            player.update_game_info(game_info)
 
-            if not game_info.players_profiles[player_id].showed_cards:
-                game_info.players_profiles[player_id].cards = []
-
-            player.update_player_profile(deepcopy(self.players_profiles[player_id]))
-
-        for i in range(self.num_players):
-            player = self.players[i]
-            player.update_game_info(deepcopy(game_info))
+        if stats is not None:
+            stats.add_time("broadcast", perf_counter() - start)
+            stats.count("broadcast_receivers", len(players_idx))
 
         if verbose:
             return game_info
 
+    @staticmethod
+    def seed_of_hand(table_seed: int, game_idx: int) -> int:
+        """
+        :return: seed of the cards of the game with the index game_idx at the table with the seed table_seed
+        """
+        return int.from_bytes(blake2b(f"{table_seed}:{game_idx}".encode(), digest_size=8).digest(), "little")
+
+    @staticmethod
+    def draw_cards(hand_seed: int, num_players: int) -> list:
+        """
+        :return: the cards dealt from the seed of the game: 5 community cards, then 2 cards for every player
+        """
+        return random.Random(hand_seed).sample(Card.deck(), k=num_players * 2 + 5)
+
     def give_cards(self):
         """
         Randomly gives the cards away and selects community cards
         """
-        deck = Card.all_possible_cards()
-        num_drawn_cards = self.num_players * 2 + 5
-        drawn_cards = sample(deck, k=num_drawn_cards)
+        if self.seed is None:
+            rng = random if self.rng is None else self.rng
+            drawn_cards = rng.sample(Card.deck(), k=self.num_players * 2 + 5)
+        else:
+            self.hand_seed = Game.seed_of_hand(self.seed, self.game_idx)
+            drawn_cards = Game.draw_cards(self.hand_seed, self.num_players)
+
+        self.deal_cards(drawn_cards)
+
+    def deal_cards(self, drawn_cards: list):
+        """
+        Gives the cards away in the order of give_cards()
+        :param drawn_cards: 5 community cards, then 2 cards for every player
+        """
         self.community_cards = drawn_cards[:5]
         self.shown_community_cards = []
 
@@ -138,58 +300,47 @@ class Game:
 
     def _get_next_player_idx(self, i: int):
         """Index of the next player still playing"""
-        j = (i + 1) % self.num_players
-
-        player_profile_j = self.players_profiles[self.players_ids[j]]
-        while player_profile_j.fold or player_profile_j.out_of_money:
-            j = (j + 1) % self.num_players
-            player_profile_j = self.players_profiles[self.players_ids[j]]
-
-        return j
+        return self.table.next_active_seat(i)
 
     def _action_processing(self, action_bet: int, player_id: uuid):
         """
         Processes the action (bet) that was made by the player
         :returns: True if the bet was raised, False otherwise
         """
-        player_profile = self.players_profiles[player_id]
-        action_bet = min(action_bet, player_profile.money)
+        table = self.table
+        seat = self.players_seats[player_id]
+        action_bet = min(action_bet, table.money[seat])
 
-        if player_profile.current_round_bet + action_bet < self.current_round_bet:
+        if table.round_bet[seat] + action_bet < self.current_round_bet:
 
-            if action_bet == player_profile.money:
-                player_profile.all_in = True
-                player_profile.money = 0
-                player_profile.current_round_bet += action_bet
-                player_profile.bet += action_bet
+            if action_bet == table.money[seat]:
+                table.set_flag(seat, TableState.ALL_IN, True)
+                table.money[seat] = 0
+                table.round_bet[seat] += action_bet
+                table.bet[seat] += action_bet
 
             else:
-                player_profile.fold = True
+                table.set_flag(seat, TableState.FOLD, True)
 
             return False
 
         else:
-            player_profile.bet += action_bet
-            player_profile.current_round_bet += action_bet
-            player_profile.money -= action_bet
+            table.bet[seat] += action_bet
+            table.round_bet[seat] += action_bet
+            table.money[seat] -= action_bet
 
-            if player_profile.money == 0:
-                player_profile.all_in = True
+            if table.money[seat] == 0:
+                table.set_flag(seat, TableState.ALL_IN, True)
 
-            if player_profile.current_round_bet == self.current_round_bet:
+            if table.round_bet[seat] == self.current_round_bet:
                 return False
 
-            self.current_round_bet = player_profile.current_round_bet
+            self.current_round_bet = table.round_bet[seat]
             return True
 
     def count_active_players(self):
         """Return the number of players still in the game"""
-        num_active_players = self.num_players
-        for player_profile in self.players_profiles.values():
-            if player_profile.out_of_money or player_profile.fold:
-                num_active_players -= 1
-
-        return num_active_players
+        return self.table.num_active
 
     def play_round(self, bet_start_idx: int):
         """
@@ -197,6 +348,17 @@ class Game:
         :param bet_start_idx: the index of the first player to bet
         :return: True if the game is still going, False otherwise
         """
+        if self.stats is None:
+            return self._play_round(bet_start_idx)
+
+        start = perf_counter()
+        going = self._play_round(bet_start_idx)
+        self.stats.add_time(f"round_{self.round_idx}", perf_counter() - start)
+        return going
+
+    def _play_round(self, bet_start_idx: int):
+        """Betting round of play_round()"""
+        stats = self.stats
 
         if self.can_raise_cnt() > 1:
 
@@ -206,14 +368,33 @@ class Game:
 
             while first_flag or last_index_raised != current_player_index:
                 first_flag = False
-                self.provide_game_info()
                 player_uuid = self.players_ids[current_player_index]
                 player = self.players[current_player_index]
                 player_profile = self.players_profiles[player_uuid]
-
-                if not (player_profile.fold or player_profile.out_of_money or player_profile.all_in):
-                    action_bet = player.action()
-                    if self._action_processing(action_bet, player_uuid):
+                acts = not self.table.status[current_player_index] & TableState.CANT_RAISE
+
+                # one snapshot for the players that follow the game and the player that acts
+                players_idx = [i for i in range(self.num_players) if self.players[i].needs_broadcast()]
+                if acts and not player.needs_broadcast():
+                    players_idx.append(current_player_index)
+                self.provide_game_info(players_idx=players_idx)
+
+                if acts:
+                    if stats is None:
+                        action_bet = player.action()
+                    else:
+                        start = perf_counter()
+                        action_bet = player.action()
+                        stats.add_action(current_player_index, type(player).__name__, perf_counter() - start)
+                    bet = player_profile.bet
+                    raised = self._action_processing(action_bet, player_uuid)
+                    if self.observers:
+                        self._notify(Action(
+                            self.game_idx, self.round_idx, current_player_index, player_profile.bet - bet,
+                            player_profile.fold, player_profile.all_in
+                        ))
+
+                    if raised:
                         last_index_raised = current_player_index
                     elif last_index_raised == current_player_index and player_profile.fold:
                         # IF THE FIRST PLAYER BET IS FOLD, MAKE THE NEXT PERSON THE FIRST ONE TO BET
@@ -227,8 +408,7 @@ class Game:
                     return False
 
         # Set current_round_bet back to 0
-        for player_profile in self.players_profiles.values():
-            player_profile.current_round_bet = 0
+        self.table.round_bet[:] = [0] * self.num_players
 
         self.provide_game_info()
         return self.count_active_players() != 1
@@ -243,10 +423,17 @@ class Game:
         Plays a game. Firstly runs rounds and updates money value in players_profiles
         :return:
         """
-        self.give_cards()
+        if self.stats is None:
+            self.give_cards()
+        else:
+            start = perf_counter()
+            self.give_cards()
+            self.stats.add_time("dealing", perf_counter() - start)
         self._update_players_profiles()
 
         active_players = self.count_active_players()
+        if self.observers:
+            self._notify(GameStarted(self.game_idx, self.dealer_idx))
 
         if active_players == 1:
             self.game_end()
@@ -257,45 +444,82 @@ class Game:
         small_blind_player_idx = self.dealer_idx if active_players == 2 else self._get_next_player_idx(self.dealer_idx)
         small_blind_player_id = self.players_ids[small_blind_player_idx]
         self._action_processing(self.small_blind, small_blind_player_id)
+        if self.observers:
+            self._notify(BlindPosted(
+                self.game_idx, small_blind_player_idx, self.players_profiles[small_blind_player_id].bet
+            ))
 
         self.current_round_bet = self.small_blind * 2
         big_blind_player_idx = self._get_next_player_idx(small_blind_player_idx)
         big_blind_player_id = self.players_ids[big_blind_player_idx]
         self._action_processing(self.small_blind * 2, big_blind_player_id)
+        if self.observers:
+            self._notify(BlindPosted(
+                self.game_idx, big_blind_player_idx, self.players_profiles[big_blind_player_id].bet
+            ))
+
+        # nobody can bet anymore (e.g. the blinds are all-in)
+        if self.can_raise_cnt() <= 1:
+            self._all_in_runout()
+            return
 
-        Game.logger.debug(f"ROUND {self.round_idx} started\n" + str(self._create_game_info()))
+        self._log_game_info("ROUND %d started", self.round_idx)
         start_bet_idx = self._get_next_player_idx(big_blind_player_idx)
         if not self.play_round(start_bet_idx):
             self.game_end()
             return
 
+        if self.can_raise_cnt() <= 1:
+            self._all_in_runout()
+            return
+
         self.round_idx += 1
         self.current_round_bet = 0
         self.shown_community_cards = self.community_cards[:3]
-        Game.logger.debug(f"ROUND {self.round_idx} started\n" + str(self._create_game_info()))
+        if self.observers:
+            self._notify(StreetDealt(self.game_idx, self.round_idx, tuple(self.community_cards[:3])))
+        self._log_game_info("ROUND %d started", self.round_idx)
         start_bet_idx = self._get_next_player_idx(self.dealer_idx)
         if not self.play_round(start_bet_idx):
             self.game_end()
             return
 
+        if self.can_raise_cnt() <= 1:
+            self._all_in_runout()
+            return
+
         self.round_idx += 1
         self.current_round_bet = 0
         self.shown_community_cards.append(self.community_cards[3])
-        Game.logger.debug(f"ROUND {self.round_idx} started\n" + str(self._create_game_info()))
+        if self.observers:
+            self._notify(StreetDealt(self.game_idx, self.round_idx, (self.community_cards[3],)))
+        self._log_game_info("ROUND %d started", self.round_idx)
         start_bet_idx = self._get_next_player_idx(self.dealer_idx)
         if not self.play_round(start_bet_idx):
             self.game_end()
             return
 
+        if self.can_raise_cnt() <= 1:
+            self._all_in_runout()
+            return
+
         self.round_idx += 1
         self.current_round_bet = 0
         self.shown_community_cards.append(self.community_cards[4])
-        Game.logger.debug(f"ROUND {self.round_idx} started\n" + str(self._create_game_info()))
+        if self.observers:
+            self._notify(StreetDealt(self.game_idx, self.round_idx, (self.community_cards[4],)))
+        self._log_game_info("ROUND %d started", self.round_idx)
         start_bet_idx = self._get_next_player_idx(self.dealer_idx)
         if not self.play_round(start_bet_idx):
             self.game_end()
             return
 
+        self._showdown()
+        self.game_end()
+        self.provide_game_info()
+
+    def _showdown(self):
+        """The players still in the game show the cards"""
         start_player_idx = cur_player_idx = self._get_next_player_idx(self.dealer_idx)
         flag = True
         while flag or cur_player_idx != start_player_idx:
@@ -303,67 +527,79 @@ class Game:
             cur_player_idx = self._get_next_player_idx(cur_player_idx)
             flag = False
 
+        if self.observers:
+            self._notify(Showdown(self.game_idx, tuple(
+                (i, tuple(self.players_profiles[player_id].cards))
+                for i, player_id in enumerate(self.players_ids) if self.players_profiles[player_id].showed_cards
+            )))
+
+    def _all_in_runout(self):
+        """
+        Nobody can bet anymore (all the players still in the game but one are all-in), so the betting rounds
+        are skipped: the rest of the community cards are dealt at once, the cards are shown and the game ends.
+        The players get the information once, in the end of the game
+        """
+        if self.stats is not None:
+            self.stats.count("all_in_runouts")
+
+        self.table.round_bet[:] = [0] * self.num_players
+        while self.round_idx < 4:
+            self.round_idx += 1
+            self.current_round_bet = 0
+            # 3 cards on the flop (round 2), then 1 card on the turn and on the river
+            new_cards = self.community_cards[len(self.shown_community_cards):self.round_idx + 1]
+            self.shown_community_cards = self.shown_community_cards + new_cards
+            if self.observers:
+                self._notify(StreetDealt(self.game_idx, self.round_idx, tuple(new_cards)))
+
+        self._log_game_info("ALL-IN, ROUND %d", self.round_idx)
+        self._showdown()
         self.game_end()
         self.provide_game_info()
 
     def game_end(self):
         """Updates the information about the end of the game (determines the winner, gives the money back"""
-        players_profiles = deepcopy(list(self.players_profiles.values()))
-
-        for player_profile in players_profiles:
-            player_profile.cards = player_profile.cards + self.community_cards
+        stats = self.stats
+        if stats is not None:
+            start = perf_counter()
 
-        players_profiles.sort(key=cmp_to_key(PlayerProfile.players_profile_comparator), reverse=True)
+        table = self.table
+        status = table.status
 
         # initial values of money for players and if the player was initially in the game
-        init_money = []
-        was_in_game = []
-
-        for i in range(len(self.players)):
-            player_id = self.players_ids[i]
-            player_profile = self.players_profiles[player_id]
-            money = player_profile.bet + player_profile.money
-            init_money.append(money)
-            was_in_game.append(not player_profile.out_of_money)
-
-
-        i = 0
-        while i < len(players_profiles):
-            if players_profiles[i].out_of_money or players_profiles[i].fold:
-                break
-            j = i
-            while j < len(players_profiles) and CombinationFinder.combination_comparator(
-                    players_profiles[i].cards, players_profiles[j].cards
-            ) == 0:
-                j += 1
-
-            # smallest bet among equally strong hand players
-            j -= 1
-            get_bet = players_profiles[j].bet
-            total_gain = 0
-            m = j - i + 1
-            for k in range(j + 1, len(players_profiles)):
-                total_gain += min(players_profiles[k].bet, get_bet)
-                players_profiles[k].bet = max(0, players_profiles[k].bet - get_bet)
-
-            for k in range(i, j + 1):
-                players_profiles[k].money += total_gain // m
-
-            for k in range(i, i + total_gain % m):
-                players_profiles[k].money += 1
-
-            # for k in range(i, j + 1):
-            #     players_profiles[k].money += players_profiles[k].bet
-
-            i = j + 1
+        init_money = [table.bet[i] + table.money[i] for i in range(self.num_players)]
+        was_in_game = [not status[i] & TableState.OUT_OF_MONEY for i in range(self.num_players)]
+
+        # the community cards are analyzed once and the hand of every player still in the game is evaluated once
+        live = [not status[i] & TableState.NOT_ACTIVE for i in range(self.num_players)]
+        if stats is not None:
+            evaluation_start = perf_counter()
+        board_state = CombinationFinder.board_state(self.community_cards)
+        hand_keys = [
+            CombinationFinder.hand_key_with_board(board_state, table.cards[i]) if live[i] else 0
+            for i in range(self.num_players)
+        ]
+        if stats is not None:
+            stats.add_time("hand_evaluation", perf_counter() - evaluation_start)
+            stats.count("hand_evaluations", sum(live))
 
-        for player_profile in players_profiles:
-            player_id = player_profile.id
-            self.players_profiles[player_id].money = player_profile.money + player_profile.bet
+        returned = SidePots.split(table.bet, live, hand_keys)
+        for i in range(self.num_players):
+            table.money[i] += returned[i]
+            table.bet[i] = 0
 
         self._update_players_profiles()
         self.dealer_idx = self._get_next_player_idx(self.dealer_idx)
-        Game.logger.debug(f"GAME ENDED: \n{str(self._create_game_info())}")
+        self._log_game_info("GAME ENDED: ")
+
+        # the players that don't get the information after every change get the result of the game
+        self.provide_game_info(
+            players_idx=[i for i in range(self.num_players) if not self.players[i].needs_broadcast()]
+        )
+        if self.observers:
+            self._notify(GameEnded(self.game_idx, tuple(
+                self.players_profiles[self.players_ids[i]].money - init_money[i] for i in range(self.num_players)
+            )))
 
         # calling game_over() for all the players, that participated in the game
         for i in range(len(self.players)):
@@ -376,11 +612,10 @@ class Game:
         self.game_idx += 1
         self.round_idx = 0
 
+        if stats is not None:
+            stats.count("games")
+            stats.add_time("game_end", perf_counter() - start)
+
     def can_raise_cnt(self):
         """Counts number of players that can raise"""
-        cnt = 0
-        for player_profile in self.players_profiles.values():
-            if not (player_profile.all_in or player_profile.out_of_money or player_profile.fold):
-                cnt += 1
-
-        return cnt
+        return self.table.num_can_raise
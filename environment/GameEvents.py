@@ -0,0 +1,99 @@
+import json
+from collections import namedtuple
+
+from .Card import Card
+
+"""
+Events of the game. Game passes them to the subscribed observers (see Game.subscribe()) as they happen,
+so the observers can follow the game without getting the whole state after every action.
+The players are identified by their seats (indexes in Game.players)
+"""
+
+
+class GameStarted(namedtuple("GameStarted", ["game_idx", "dealer_idx"])):
+    """New game started, the cards are dealt"""
+    __slots__ = ()
+
+
+class BlindPosted(namedtuple("BlindPosted", ["game_idx", "seat", "amount"])):
+    """The player at the seat posted the blind (amount can be smaller than the blind if the player is all-in)"""
+    __slots__ = ()
+
+
+class Action(namedtuple("Action", ["game_idx", "round_idx", "seat", "amount", "fold", "all_in"])):
+    """The player at the seat acted: put amount of money into the pot, folded or went all-in"""
+    __slots__ = ()
+
+
+class StreetDealt(namedtuple("StreetDealt", ["game_idx", "round_idx", "cards"])):
+    """New community cards were shown (tuple of Card)"""
+    __slots__ = ()
+
+
+class Showdown(namedtuple("Showdown", ["game_idx", "cards"])):
+    """The players showed the cards: tuple of (seat, tuple of Card)"""
+    __slots__ = ()
+
+
+class GameEnded(namedtuple("GameEnded", ["game_idx", "gains"])):
+    """The pot was given away. gains is a tuple of the money every seat earned (negative if lost)"""
+    __slots__ = ()
+
+
+class GameObserver:
+    """
+    Base of the observers of the game events
+    """
+
+    def on_event(self, event):
+        """Called by the game for every event"""
+        pass
+
+
+class JsonLinesObserver(GameObserver):
+    """
+    Writes every event as one line of JSON: {"event": "Action", "game_idx": 0, ...}. The cards are written
+    as their values (e.g. "H1"). Meant for the traces of the games, when the debug log is too slow and too verbose
+    """
+
+    def __init__(self, file, flush_every: int = 0):
+        """
+        :param file: path of the file (the events are appended) or a text file object
+        :param flush_every: flush the file after every flush_every events, 0 to leave it to the buffering of the file
+        """
+        self._own_file = isinstance(file, str)
+        self.file = open(file, "a") if self._own_file else file
+        self.flush_every = flush_every
+        self.num_events = 0
+
+    @staticmethod
+    def _to_json(value):
+        """Converts the value of the event field to the JSON compatible value"""
+        if isinstance(value, Card):
+            return value.val
+        if isinstance(value, tuple):
+            return [JsonLinesObserver._to_json(item) for item in value]
+        return value
+
+    def on_event(self, event):
+        record = {"event": type(event).__name__}
+        for key, value in zip(event._fields, event):
+            record[key] = JsonLinesObserver._to_json(value)
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+        self.num_events += 1
+        if self.flush_every and self.num_events % self.flush_every == 0:
+            self.file.flush()
+
+    def close(self):
+        """Flushes the events and closes the file if it was opened by the observer"""
+        if self._own_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
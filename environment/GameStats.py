@@ -0,0 +1,84 @@
+import json
+
+
+class GameStats:
+    """
+    Counters and cumulative timers of the game (see the stats argument of Game). Timers are kept by names as
+    [number of measurements, total seconds, maximal seconds]: \n
+    dealing, round_1 ... round_4 (betting rounds), broadcast (provide_game_info()), action/seat_<seat> and
+    action/<class of the player> (time of player.action()), hand_evaluation, game_end. The timers are nested:
+    the time of a round includes the actions and the broadcasts of the round, game_end includes hand_evaluation. \n
+    Counters: games, broadcast_receivers (number of players the information was provided to), hand_evaluations,
+    all_in_runouts
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name: str, n: int = 1):
+        """Adds n to the counter"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name: str, seconds: float):
+        """Adds one measurement to the timer"""
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, seconds, seconds]
+            return
+
+        timer[0] += 1
+        timer[1] += seconds
+        if seconds > timer[2]:
+            timer[2] = seconds
+
+    def add_action(self, seat: int, player_class: str, seconds: float):
+        """Adds the time of the action of the player at the seat"""
+        self.add_time(f"action/seat_{seat}", seconds)
+        self.add_time(f"action/{player_class}", seconds)
+
+    def merge(self, stats: "GameStats"):
+        """Adds the counters and timers of the other stats (e.g. of the other tables)"""
+        for name, n in stats.counters.items():
+            self.count(name, n)
+        for name, (count, total, maximum) in stats.timers.items():
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += count
+            timer[1] += total
+            timer[2] = max(timer[2], maximum)
+
+    def reset(self):
+        self.counters.clear()
+        self.timers.clear()
+
+    def to_dict(self) -> dict:
+        """
+        :return: the counters and the timers (count, total and maximal seconds, mean microseconds) by names
+        """
+        return {
+            "counters": dict(self.counters),
+            "timers": {
+                name: {"count": count, "total_s": total, "mean_us": total / count * 1e6, "max_us": maximum * 1e6}
+                for name, (count, total, maximum) in sorted(self.timers.items())
+            },
+        }
+
+    def dump(self, file):
+        """
+        Writes the stats as JSON
+        :param file: path or text file object
+        """
+        if isinstance(file, str):
+            with open(file, "w") as f:
+                json.dump(self.to_dict(), f, indent=2)
+        else:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def __str__(self):
+        s = ""
+        for name, n in sorted(self.counters.items()):
+            s += f"{name}: {n}\n"
+        for name, timer in self.to_dict()["timers"].items():
+            s += f"{name}: {timer['count']} times, {timer['total_s']:.3f} s, mean {timer['mean_us']:.1f} us, " \
+                 f"max {timer['max_us']:.1f} us\n"
+        return s
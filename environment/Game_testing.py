@@ -0,0 +1,85 @@
+import sys
+
+from poker.environment.BatchGame_testing import ScriptedPlayer
+from poker.environment.Game import Game
+
+"""
+Checks of Game.snapshot() and Game.restore(): the alternative bets are made and rolled back at every decision,
+the games must end with the same money as the games played without them
+"""
+
+
+class ExploringPlayer(ScriptedPlayer):
+    """
+    Scripted player that tries the alternative bets of all the seats before it acts and restores the game after
+    every one of them
+    """
+
+    def __init__(self, table: int, seat: int):
+        super().__init__(table, seat)
+        self.game = None
+        self.num_rollbacks = 0
+
+    def action(self):
+        game = self.game
+        state = game.snapshot()
+
+        call = game.current_round_bet - self.player_profile.current_round_bet
+        for alternative_bet in [-1, call, call + 3 * game.small_blind, self.player_profile.money]:
+            game._action_processing(alternative_bet, game.players_ids[self.seat])
+            # the other players answer the bet
+            for seat in range(game.num_players):
+                if seat != self.seat:
+                    game._action_processing(game.current_round_bet - game.table.round_bet[seat], game.players_ids[seat])
+
+            game.restore(state)
+            assert game.snapshot() == state
+            self.num_rollbacks += 1
+
+        return super().action()
+
+
+def play_tables(num_tables: int, num_games: int, exploring: bool) -> tuple:
+    """
+    :return: the money of every table in the end and the number of the rolled back bets
+    """
+    tables_money = []
+    num_rollbacks = 0
+    for table in range(num_tables):
+        num_seats = 2 + table % 5
+        player_type = ExploringPlayer if exploring else ScriptedPlayer
+        players = [player_type(table, seat) for seat in range(num_seats)]
+        game = Game(players, 200, 5, seed=table)
+        for player in players:
+            player.game = game
+
+        while game.count_active_players() > 1 and game.game_idx < num_games:
+            game.play_game()
+        tables_money.append(list(game.table.money))
+        num_rollbacks += sum(getattr(player, "num_rollbacks", 0) for player in players)
+
+    return tables_money, num_rollbacks
+
+
+if __name__ == '__main__':
+    num_tables = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    # TEST 1 THE ALTERNATIVE BETS ROLLED BACK AT EVERY DECISION DON'T CHANGE THE GAMES
+    plain_money, _ = play_tables(num_tables, 30, exploring=False)
+    exploring_money, num_rollbacks = play_tables(num_tables, 30, exploring=True)
+    print(f"{num_tables} tables, {num_rollbacks} rolled back bets")
+    assert num_rollbacks > 0
+    assert exploring_money == plain_money
+
+    # TEST 2 THE WHOLE GAME IS ROLLED BACK: THE SAME GAME IS PLAYED AGAIN WITH THE SAME RESULT
+    game = Game([ScriptedPlayer(0, seat) for seat in range(4)], 200, 5, seed=0)
+    for _ in range(5):
+        state = game.snapshot()
+        game.play_game()
+        played_state = game.snapshot()
+
+        game.restore(state)
+        game.play_game()
+        assert game.snapshot() == played_state
+
+    print("ALL TESTS PASSED")
@@ -0,0 +1,390 @@
+import numpy as np
+
+
+def _highest_rank(mask: int) -> int:
+    """Index of the highest set bit (0 for an empty mask)"""
+    return max(mask.bit_length() - 1, 0)
+
+
+def _pack_top5(mask: int) -> int:
+    """Packs up to five highest ranks of the mask into nibbles, the highest rank goes first"""
+    packed = 0
+    shift = 16
+    for rank in range(12, -1, -1):
+        if shift < 0:
+            break
+        if mask & (1 << rank):
+            packed |= rank << shift
+            shift -= 4
+    return packed
+
+
+def _straight_high(mask: int) -> int:
+    """Rank of the highest card of the best straight in the mask, -1 if there is no straight"""
+    for high in range(12, 3, -1):
+        run = 0b11111 << (high - 4)
+        if mask & run == run:
+            return high
+
+    # the wheel (A, 2, 3, 4, 5), ace is played as the lowest card
+    wheel = (1 << 12) | 0b1111
+    if mask & wheel == wheel:
+        return 3
+
+    return -1
+
+
+class HandEvaluator:
+    """
+    Table driven hand evaluator. Maps any set of 5, 6 or 7 cards to a single integer (rank),
+    so that a stronger hand always has the greater rank and equally strong hands have equal ranks. \n
+    Cards are encoded with ids from 0 to 51: id = 13 * suit + rank, where suit is from 0 to 3 (hearts, diamonds,
+    clubs, spades) and rank is from 0 to 12 (2, 3, ..., K, A). A set of cards is a mask with bit id set for every card,
+    hence every suit occupies its own 13 bits of the mask. \n
+    The rank is category << 20 | five kickers ranks (4 bits each, the most significant first).
+    Categories are the same as the values returned by CombinationFinder.combination_determiner
+    """
+    HIGH_CARD = 1
+    PAIR = 2
+    TWO_PAIRS = 3
+    THREE_OF_A_KIND = 4
+    STRAIGHT = 5
+    FLUSH = 6
+    FULL_HOUSE = 7
+    FOUR_OF_A_KIND = 8
+    STRAIGHT_FLUSH = 9
+    ROYAL_FLUSH = 10
+
+    CATEGORY_SHIFT = 20
+    SUIT_MASK = 0x1FFF
+
+    # tables indexed by 13 bit rank masks
+    _popcount = [bin(mask).count("1") for mask in range(1 << 13)]
+    _top_bit = [_highest_rank(mask) for mask in range(1 << 13)]
+    _top5 = [_pack_top5(mask) for mask in range(1 << 13)]
+    _straight = [0] * (1 << 13)
+    _flush = [0] * (1 << 13)
+
+    for mask in range(1 << 13):
+        high = _straight_high(mask)
+        if high >= 0:
+            _straight[mask] = STRAIGHT << CATEGORY_SHIFT | high << 16
+
+        if _popcount[mask] >= 5:
+            if high == 12:
+                _flush[mask] = ROYAL_FLUSH << CATEGORY_SHIFT | high << 16
+            elif high >= 0:
+                _flush[mask] = STRAIGHT_FLUSH << CATEGORY_SHIFT | high << 16
+            else:
+                _flush[mask] = FLUSH << CATEGORY_SHIFT | _top5[mask]
+    del mask, high
+
+    # the same tables for the vectorized evaluation
+    _np_popcount = np.array(_popcount, dtype=np.int8)
+    _np_top_bit = np.array(_top_bit, dtype=np.int64)
+    _np_top5 = np.array(_top5, dtype=np.int64)
+    _np_straight = np.array(_straight, dtype=np.int64)
+    _np_flush = np.array(_flush, dtype=np.int64)
+
+    @staticmethod
+    def evaluate(mask: int) -> int:
+        """
+        Evaluates the set of cards
+        :param mask: mask of 5, 6 or 7 cards
+        :return: rank of the best 5 cards combination
+        """
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = mask & suit_mask
+        d = (mask >> 13) & suit_mask
+        c = (mask >> 26) & suit_mask
+        s = (mask >> 39) & suit_mask
+
+        # masks of ranks present at least once, twice, three and four times
+        any_ = h | d | c | s
+        two = (h & d) | (c & s) | ((h | d) & (c | s))
+        three = (h & d & (c | s)) | (c & s & (h | d))
+        four = h & d & c & s
+
+        popcount = HandEvaluator._popcount
+        flush = 0
+        for suit in (h, d, c, s):
+            if popcount[suit] >= 5:
+                flush = HandEvaluator._flush[suit]
+                break
+
+        return HandEvaluator._rank(any_, two, three, four, flush)
+
+    @staticmethod
+    def board_state(board_mask: int) -> tuple:
+        """
+        Analyzes the community cards once, so that the hands of all the players can be evaluated
+        with evaluate_hole() by only adding their hole cards
+        :param board_mask: mask of 3, 4 or 5 community cards
+        :return: board mask, masks of ranks present at least once, twice, three and four times,
+        and the shift of the only suit that can make a flush (-1 if a flush is impossible)
+        """
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = board_mask & suit_mask
+        d = (board_mask >> 13) & suit_mask
+        c = (board_mask >> 26) & suit_mask
+        s = (board_mask >> 39) & suit_mask
+
+        any_ = h | d | c | s
+        two = (h & d) | (c & s) | ((h | d) & (c | s))
+        three = (h & d & (c | s)) | (c & s & (h | d))
+        four = h & d & c & s
+
+        # two hole cards can only complete a flush of a suit that has at least 3 community cards
+        flush_shift = -1
+        for shift in (0, 13, 26, 39):
+            if HandEvaluator._popcount[(board_mask >> shift) & suit_mask] >= 3:
+                flush_shift = shift
+                break
+
+        return board_mask, any_, two, three, four, flush_shift
+
+    @staticmethod
+    def evaluate_hole(board_state: tuple, hole_mask: int) -> int:
+        """
+        Evaluates the community cards together with the hole cards
+        :param board_state: state returned by board_state()
+        :param hole_mask: mask of 1 or 2 hole cards
+        :return: the same rank as evaluate() of all the cards
+        """
+        board_mask, any_, two, three, four, flush_shift = board_state
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = hole_mask & suit_mask
+        d = (hole_mask >> 13) & suit_mask
+        c = (hole_mask >> 26) & suit_mask
+        s = (hole_mask >> 39) & suit_mask
+
+        # ranks of the hole cards present at least once and twice
+        hole_any = h | d | c | s
+        hole_two = (h & d) | (c & s) | ((h | d) & (c | s))
+
+        flush = 0
+        if flush_shift >= 0:
+            suit = ((board_mask | hole_mask) >> flush_shift) & suit_mask
+            if HandEvaluator._popcount[suit] >= 5:
+                flush = HandEvaluator._flush[suit]
+
+        # a rank is present k times if it is present i times on the board and k - i times in the hole cards
+        return HandEvaluator._rank(
+            any_ | hole_any,
+            two | (any_ & hole_any) | hole_two,
+            three | (two & hole_any) | (any_ & hole_two),
+            four | (three & hole_any) | (two & hole_two),
+            flush
+        )
+
+    @staticmethod
+    def _rank(any_: int, two: int, three: int, four: int, flush: int) -> int:
+        """
+        :param any_: mask of ranks present at least once
+        :param two: mask of ranks present at least twice
+        :param three: mask of ranks present at least three times
+        :param four: mask of ranks present four times
+        :param flush: _flush value of the suit with at least 5 cards, 0 if there is no such suit
+        :return: rank of the best 5 cards combination
+        """
+        top_bit = HandEvaluator._top_bit
+        top5 = HandEvaluator._top5
+
+        if flush >= HandEvaluator.STRAIGHT_FLUSH << HandEvaluator.CATEGORY_SHIFT:
+            return flush
+
+        if four:
+            quad = top_bit[four]
+            kicker = top_bit[any_ & ~(1 << quad)]
+            return HandEvaluator.FOUR_OF_A_KIND << HandEvaluator.CATEGORY_SHIFT | quad << 16 | kicker << 12
+
+        if three:
+            trips = top_bit[three]
+            pairs = two & ~(1 << trips)
+            if pairs:
+                return HandEvaluator.FULL_HOUSE << HandEvaluator.CATEGORY_SHIFT | trips << 16 | top_bit[pairs] << 12
+
+        if flush:
+            return flush
+
+        straight = HandEvaluator._straight[any_]
+        if straight:
+            return straight
+
+        if three:
+            kickers = (top5[any_ & ~(1 << trips)] >> 4) & 0xFF00
+            return HandEvaluator.THREE_OF_A_KIND << HandEvaluator.CATEGORY_SHIFT | trips << 16 | kickers
+
+        if two:
+            pair1 = top_bit[two]
+            rest = two & ~(1 << pair1)
+            if rest:
+                pair2 = top_bit[rest]
+                kicker = top_bit[any_ & ~(1 << pair1) & ~(1 << pair2)]
+                return HandEvaluator.TWO_PAIRS << HandEvaluator.CATEGORY_SHIFT \
+                    | pair1 << 16 | pair2 << 12 | kicker << 8
+
+            kickers = (top5[any_ & ~(1 << pair1)] >> 4) & 0xFFF0
+            return HandEvaluator.PAIR << HandEvaluator.CATEGORY_SHIFT | pair1 << 16 | kickers
+
+        return HandEvaluator.HIGH_CARD << HandEvaluator.CATEGORY_SHIFT | top5[any_]
+
+    @staticmethod
+    def category(rank: int) -> int:
+        """
+        :param rank: rank returned by evaluate()
+        :return: combination category from 1 (high card) to 10 (royal flush)
+        """
+        return rank >> HandEvaluator.CATEGORY_SHIFT
+
+    @staticmethod
+    def masks_from_ids(card_ids: np.ndarray) -> np.ndarray:
+        """
+        :param card_ids: integer array of shape (N, k) of the card ids
+        :return: int64 array of shape (N,) of the cards masks
+        """
+        card_ids = np.asarray(card_ids, dtype=np.int64)
+        return np.bitwise_or.reduce(np.left_shift(np.int64(1), card_ids), axis=-1)
+
+    @staticmethod
+    def evaluate_batch(card_ids: np.ndarray) -> np.ndarray:
+        """
+        Vectorized evaluate() for the matrix of hands
+        :param card_ids: integer array of shape (N, k) of the card ids, where k is 5, 6 or 7
+        :return: int64 array of shape (N,) of the ranks
+        """
+        return HandEvaluator.evaluate_mask_batch(HandEvaluator.masks_from_ids(card_ids))
+
+    @staticmethod
+    def evaluate_mask_batch(masks: np.ndarray) -> np.ndarray:
+        """
+        Vectorized evaluate(). The same combinations are checked in the same order,
+        but for all the masks at once
+        :param masks: int64 array of masks of 5, 6 or 7 cards
+        :return: int64 array of the ranks of the same shape
+        """
+        masks = np.asarray(masks, dtype=np.int64)
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = masks & suit_mask
+        d = (masks >> 13) & suit_mask
+        c = (masks >> 26) & suit_mask
+        s = (masks >> 39) & suit_mask
+
+        any_ = h | d | c | s
+        two = (h & d) | (c & s) | ((h | d) & (c | s))
+        three = (h & d & (c | s)) | (c & s & (h | d))
+        four = h & d & c & s
+
+        popcount = HandEvaluator._np_popcount
+        flush = np.zeros_like(masks)
+        for suit in (h, d, c, s):
+            flush = np.where(popcount[suit] >= 5, HandEvaluator._np_flush[suit], flush)
+
+        return HandEvaluator._rank_batch(any_, two, three, four, flush)
+
+    @staticmethod
+    def board_state_batch(board_masks: np.ndarray) -> tuple:
+        """
+        Vectorized board_state()
+        :param board_masks: int64 array of masks of 3, 4 or 5 community cards
+        :return: tuple of arrays of the same shape as board_masks
+        """
+        board_masks = np.asarray(board_masks, dtype=np.int64)
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = board_masks & suit_mask
+        d = (board_masks >> 13) & suit_mask
+        c = (board_masks >> 26) & suit_mask
+        s = (board_masks >> 39) & suit_mask
+
+        any_ = h | d | c | s
+        two = (h & d) | (c & s) | ((h | d) & (c | s))
+        three = (h & d & (c | s)) | (c & s & (h | d))
+        four = h & d & c & s
+
+        popcount = HandEvaluator._np_popcount
+        flush_shift = np.full_like(board_masks, -1)
+        for shift, suit in zip((39, 26, 13, 0), (s, c, d, h)):
+            flush_shift = np.where(popcount[suit] >= 3, shift, flush_shift)
+
+        return board_masks, any_, two, three, four, flush_shift
+
+    @staticmethod
+    def evaluate_hole_batch(board_state: tuple, hole_masks: np.ndarray) -> np.ndarray:
+        """
+        Vectorized evaluate_hole()
+        :param board_state: state returned by board_state_batch() for the boards of shape (N,)
+        :param hole_masks: int64 array of masks of 1 or 2 hole cards of shape (N,) or (N, M)
+        (M hands with the same board)
+        :return: int64 array of the ranks of the same shape as hole_masks
+        """
+        hole_masks = np.asarray(hole_masks, dtype=np.int64)
+        board_masks, any_, two, three, four, flush_shift = (
+            np.reshape(a, a.shape + (1,) * (hole_masks.ndim - a.ndim)) for a in board_state
+        )
+        suit_mask = HandEvaluator.SUIT_MASK
+        h = hole_masks & suit_mask
+        d = (hole_masks >> 13) & suit_mask
+        c = (hole_masks >> 26) & suit_mask
+        s = (hole_masks >> 39) & suit_mask
+
+        hole_any = h | d | c | s
+        hole_two = (h & d) | (c & s) | ((h | d) & (c | s))
+
+        suit = ((board_masks | hole_masks) >> np.maximum(flush_shift, 0)) & suit_mask
+        flush = np.where(
+            (flush_shift >= 0) & (HandEvaluator._np_popcount[suit] >= 5), HandEvaluator._np_flush[suit], 0
+        )
+
+        return HandEvaluator._rank_batch(
+            any_ | hole_any,
+            two | (any_ & hole_any) | hole_two,
+            three | (two & hole_any) | (any_ & hole_two),
+            four | (three & hole_any) | (two & hole_two),
+            flush
+        )
+
+    @staticmethod
+    def _rank_batch(any_: np.ndarray, two: np.ndarray, three: np.ndarray, four: np.ndarray,
+                    flush: np.ndarray) -> np.ndarray:
+        """
+        Vectorized _rank()
+        """
+        shift = HandEvaluator.CATEGORY_SHIFT
+        top_bit = HandEvaluator._np_top_bit
+        top5 = HandEvaluator._np_top5
+
+        quad = top_bit[four]
+        four_key = HandEvaluator.FOUR_OF_A_KIND << shift | quad << 16 | top_bit[any_ & ~(1 << quad)] << 12
+
+        trips = top_bit[three]
+        full_house_pairs = two & ~(1 << trips)
+        full_house_key = HandEvaluator.FULL_HOUSE << shift | trips << 16 | top_bit[full_house_pairs] << 12
+
+        straight_key = HandEvaluator._np_straight[any_]
+
+        three_key = HandEvaluator.THREE_OF_A_KIND << shift | trips << 16 \
+            | (top5[any_ & ~(1 << trips)] >> 4) & 0xFF00
+
+        pair1 = top_bit[two]
+        rest = two & ~(1 << pair1)
+        pair2 = top_bit[rest]
+        two_pairs_key = HandEvaluator.TWO_PAIRS << shift | pair1 << 16 | pair2 << 12 \
+            | top_bit[any_ & ~(1 << pair1) & ~(1 << pair2)] << 8
+        pair_key = HandEvaluator.PAIR << shift | pair1 << 16 | (top5[any_ & ~(1 << pair1)] >> 4) & 0xFFF0
+
+        high_card_key = HandEvaluator.HIGH_CARD << shift | top5[any_]
+
+        return np.select(
+            [
+                flush >= HandEvaluator.STRAIGHT_FLUSH << shift,
+                four != 0,
+                (three != 0) & (full_house_pairs != 0),
+                flush != 0,
+                straight_key != 0,
+                three != 0,
+                rest != 0,
+                two != 0,
+            ],
+            [flush, four_key, full_house_key, flush, straight_key, three_key, two_pairs_key, pair_key],
+            high_card_key
+        )
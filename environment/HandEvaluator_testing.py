@@ -0,0 +1,122 @@
+import sys
+from collections import Counter
+from itertools import combinations
+from random import Random
+
+import numpy as np
+
+from poker.environment.Card import Card, CombinationFinder
+from poker.environment.HandEvaluator import HandEvaluator
+
+"""
+Randomized check of HandEvaluator against the brute force reference: every 5 cards subset of the hand is ranked
+by the rules of the combinations and the best one is taken
+"""
+
+
+def five_cards_key(card_ids: tuple) -> tuple:
+    """
+    :param card_ids: ids of 5 cards
+    :return: category (the same as HandEvaluator) and the ranks that break the ties, the stronger the greater
+    """
+    ranks = [card_id % 13 for card_id in card_ids]
+    is_flush = len({card_id // 13 for card_id in card_ids}) == 1
+
+    unique_ranks = sorted(set(ranks))
+    straight_high = -1
+    if len(unique_ranks) == 5 and unique_ranks[4] - unique_ranks[0] == 4:
+        straight_high = unique_ranks[4]
+    elif unique_ranks == [0, 1, 2, 3, 12]:
+        # the wheel, ace is the lowest card
+        straight_high = 3
+
+    if is_flush and straight_high == 12:
+        return HandEvaluator.ROYAL_FLUSH, 12
+    if is_flush and straight_high >= 0:
+        return HandEvaluator.STRAIGHT_FLUSH, straight_high
+
+    # ranks by the number of the cards, then by the rank
+    groups = sorted(Counter(ranks).items(), key=lambda item: (item[1], item[0]), reverse=True)
+    counts = [count for _, count in groups]
+    tiebreak = tuple(rank for rank, _ in groups)
+
+    if counts[0] == 4:
+        return (HandEvaluator.FOUR_OF_A_KIND,) + tiebreak
+    if counts[:2] == [3, 2]:
+        return (HandEvaluator.FULL_HOUSE,) + tiebreak
+    if is_flush:
+        return (HandEvaluator.FLUSH,) + tiebreak
+    if straight_high >= 0:
+        return HandEvaluator.STRAIGHT, straight_high
+    if counts[0] == 3:
+        return (HandEvaluator.THREE_OF_A_KIND,) + tiebreak
+    if counts[:2] == [2, 2]:
+        return (HandEvaluator.TWO_PAIRS,) + tiebreak
+    if counts[0] == 2:
+        return (HandEvaluator.PAIR,) + tiebreak
+    return (HandEvaluator.HIGH_CARD,) + tiebreak
+
+
+def brute_force_key(card_ids: tuple) -> tuple:
+    """
+    :param card_ids: ids of 5, 6 or 7 cards
+    :return: key of the best 5 cards of the hand
+    """
+    return max(five_cards_key(five) for five in combinations(card_ids, 5))
+
+
+def check(hands: list) -> list:
+    """
+    :param hands: tuples of the card ids
+    :return: the pairs of the hands HandEvaluator ranks differently from the reference
+    (the hands are compared in the order of the reference keys, the neighbours must compare the same way)
+    """
+    reference = [brute_force_key(hand) for hand in hands]
+    ranks = [HandEvaluator.evaluate(Card.to_mask(Card.from_array(hand))) for hand in hands]
+
+    mismatches = []
+    order = sorted(range(len(hands)), key=lambda i: reference[i])
+    for i, j in zip(order, order[1:]):
+        same_order = (reference[i] < reference[j]) == (ranks[i] < ranks[j])
+        same_tie = (reference[i] == reference[j]) == (ranks[i] == ranks[j])
+        if not (same_order and same_tie):
+            mismatches.append((hands[i], hands[j]))
+    for i in range(len(hands)):
+        if HandEvaluator.category(ranks[i]) != reference[i][0]:
+            mismatches.append((hands[i], hands[i]))
+    return mismatches
+
+
+if __name__ == '__main__':
+    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = Random(0)
+    hands = [tuple(rng.sample(range(52), rng.choice([5, 6, 7]))) for _ in range(num_hands)]
+
+    # TEST 1 RANDOM HANDS OF 5, 6 AND 7 CARDS ARE RANKED IN THE SAME ORDER AS BY THE REFERENCE
+    mismatches = check(hands)
+    for hand1, hand2 in mismatches[:5]:
+        print(f"{Card.from_array(hand1)} and {Card.from_array(hand2)} are ranked differently")
+    print(f"{num_hands} hands, {len(mismatches)} mismatches")
+
+    # TEST 2 THE BATCH EVALUATION IS THE SAME AS THE SINGLE ONE
+    seven_cards = np.array([hand for hand in hands if len(hand) == 7], dtype=np.int64)
+    single = [HandEvaluator.evaluate(Card.to_mask(Card.from_array(hand))) for hand in seven_cards.tolist()]
+    batch_mismatches = np.count_nonzero(HandEvaluator.evaluate_batch(seven_cards) != single)
+    print(f"{len(seven_cards)} hands of 7 cards, {batch_mismatches} batch mismatches")
+
+    # TEST 3 THE COMBINATIONS CHECKS OF COMBINATIONFINDER FIND THE BEST COMBINATION
+    checks = [
+        (["S2", "S3", "S4", "S5", "S1", "Hd", "Dd"], CombinationFinder.has_straight_flush),
+        (["Ha", "Hb", "Hc", "Hd", "H1", "S2", "D3"], CombinationFinder.has_royal_flush),
+        (["H2", "D2", "C2", "S2", "H9", "D9", "C9"], CombinationFinder.has_four_of_a_kind),
+        (["H2", "D2", "C2", "S9", "H9", "D5", "C4"], CombinationFinder.has_full_house),
+        (["H2", "H5", "H7", "H9", "Hb", "D3", "C4"], CombinationFinder.has_flush),
+        (["H1", "D2", "C3", "S4", "H5", "Dd", "Cb"], CombinationFinder.has_straight),
+        (["H7", "D7", "C7", "S2", "H9", "Dd", "Cb"], CombinationFinder.has_three_of_a_kind),
+        (["H7", "D7", "C9", "S9", "H2", "D2", "Cb"], CombinationFinder.has_two_pairs),
+        (["H7", "D7", "C9", "S4", "H2", "Dd", "Cb"], CombinationFinder.has_pair),
+    ]
+    wrong_checks = [values for values, has in checks if not has([Card(value) for value in values])]
+    print(f"{len(checks)} combinations checks, {len(wrong_checks)} wrong")
+
+    print("ALL TESTS PASSED" if not mismatches and not batch_mismatches and not wrong_checks else "MISMATCHES FOUND")
@@ -0,0 +1,299 @@
+import atexit
+import os
+import struct
+from collections import namedtuple
+from time import monotonic
+
+from .GameEvents import GameObserver, GameStarted, BlindPosted, Action, StreetDealt, GameEnded
+from .TableState import TableState
+
+
+class HandRecord(namedtuple("HandRecord", ["game_idx", "dealer_idx", "small_blind", "board", "num_shown",
+                                           "money", "hole_cards", "actions", "gains", "seed"],
+                                defaults=(None,))):
+    """
+    One played hand (game): \n
+    board - ids of all 5 community cards, num_shown - how many of them were shown \n
+    money - money of every seat before the hand, hole_cards - pairs of card ids of every seat \n
+    actions - tuple of (round_idx, seat, amount, flags) in the order of the actions, blinds included
+    (flags are HandHistory.FOLD, ALL_IN and BLIND) \n
+    gains - money every seat earned in the hand (negative if lost) \n
+    seed - seed the cards were dealt from (see Game.seed_of_hand()), None if the table had no seed
+    """
+    __slots__ = ()
+
+
+class HandHistory:
+    """
+    Compact binary format of the hand history. The file starts with the header (MAGIC and VERSION),
+    then go the records one after another, every record starts with its length, so the records can be skipped
+    without decoding
+    """
+    MAGIC = b"PKHH"
+    # 2: the seed of the cards was added
+    VERSION = 2
+
+    # flags of the actions
+    FOLD = 1
+    ALL_IN = 2
+    BLIND = 4
+
+    _header = struct.Struct("<4sH")
+    _length = struct.Struct("<I")
+    # game_idx, dealer_idx, small_blind, num_seats, num_shown, board, num_actions, has seed, seed
+    _hand = struct.Struct("<IBIBB5BH?Q")
+    _hand_v1 = struct.Struct("<IBIBB5BH")
+    # money, 2 hole cards
+    _seat = struct.Struct("<IBB")
+    # round_idx, seat, flags, amount
+    _action = struct.Struct("<BBBI")
+    _gain = struct.Struct("<i")
+
+    @staticmethod
+    def encode(record: HandRecord) -> bytes:
+        """
+        :return: the record with its length in the binary format
+        """
+        num_seats = len(record.money)
+        parts = [HandHistory._hand.pack(
+            record.game_idx, record.dealer_idx, record.small_blind, num_seats, record.num_shown, *record.board,
+            len(record.actions), record.seed is not None, record.seed or 0
+        )]
+        for money, (card1, card2) in zip(record.money, record.hole_cards):
+            parts.append(HandHistory._seat.pack(money, card1, card2))
+        for round_idx, seat, amount, flags in record.actions:
+            parts.append(HandHistory._action.pack(round_idx, seat, flags, amount))
+        for gain in record.gains:
+            parts.append(HandHistory._gain.pack(gain))
+
+        body = b"".join(parts)
+        return HandHistory._length.pack(len(body)) + body
+
+    @staticmethod
+    def decode(buffer, offset: int = 0, version: int = VERSION) -> tuple:
+        """
+        :param buffer: bytes of the records
+        :param offset: offset of the record (of its length)
+        :param version: version of the file the record is from
+        :return: the record and the offset of the next record
+        """
+        length, = HandHistory._length.unpack_from(buffer, offset)
+        offset += HandHistory._length.size
+        end = offset + length
+
+        hand = HandHistory._hand if version >= 2 else HandHistory._hand_v1
+        game_idx, dealer_idx, small_blind, num_seats, num_shown, *rest = hand.unpack_from(buffer, offset)
+        board, num_actions = tuple(rest[:5]), rest[5]
+        seed = rest[7] if version >= 2 and rest[6] else None
+        offset += hand.size
+
+        money = []
+        hole_cards = []
+        for money_, card1, card2 in HandHistory._seat.iter_unpack(
+                buffer[offset:offset + num_seats * HandHistory._seat.size]
+        ):
+            money.append(money_)
+            hole_cards.append((card1, card2))
+        offset += num_seats * HandHistory._seat.size
+
+        actions = tuple(
+            (round_idx, seat, amount, flags)
+            for round_idx, seat, flags, amount in
+            HandHistory._action.iter_unpack(buffer[offset:offset + num_actions * HandHistory._action.size])
+        )
+        offset += num_actions * HandHistory._action.size
+
+        gains = tuple(gain for gain, in HandHistory._gain.iter_unpack(buffer[offset:end]))
+
+        return HandRecord(
+            game_idx, dealer_idx, small_blind, board, num_shown, tuple(money), tuple(hole_cards), actions, gains, seed
+        ), end
+
+    @staticmethod
+    def files(path: str) -> list:
+        """
+        :return: the file and all its rotated files (see HandHistoryWriter) in the order they were written
+        """
+        paths = []
+        index = 0
+        while os.path.exists(HandHistoryWriter.file_name(path, index)):
+            paths.append(HandHistoryWriter.file_name(path, index))
+            index += 1
+        return paths
+
+    @staticmethod
+    def read(path: str, chunk_size: int = 1 << 20):
+        """
+        Reads the records lazily, the file is read by chunks
+        :param path: the file written by HandHistoryWriter (with all its rotated files)
+        :param chunk_size: number of bytes read at once
+        :return: generator of HandRecord
+        """
+        for file_path in HandHistory.files(path):
+            with open(file_path, "rb") as f:
+                magic, version = HandHistory._header.unpack(f.read(HandHistory._header.size))
+                if magic != HandHistory.MAGIC:
+                    raise ValueError(f"{file_path} is not a hand history file")
+                if not 1 <= version <= HandHistory.VERSION:
+                    raise ValueError(f"Unsupported version {version} of the hand history in {file_path}")
+
+                buffer = b""
+                offset = 0
+                while True:
+                    # the records are decoded while the whole record is in the buffer
+                    while len(buffer) - offset >= HandHistory._length.size:
+                        length, = HandHistory._length.unpack_from(buffer, offset)
+                        if len(buffer) - offset < HandHistory._length.size + length:
+                            break
+                        record, offset = HandHistory.decode(buffer, offset, version)
+                        yield record
+
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    buffer = buffer[offset:] + chunk
+                    offset = 0
+
+                if offset != len(buffer):
+                    raise ValueError(f"Truncated record in the end of {file_path}")
+
+
+class HandHistoryWriter:
+    """
+    Append-only writer of the hand history. The records are kept in memory and written to the file
+    after every flush_every records, or by the first record written flush_interval seconds after the last flush.
+    If max_bytes is set, the next file is started when the file gets bigger (the files are path, path.1, path.2, ...).
+    \n
+    The writer is closed at the exit of the interpreter if close() wasn't called, so the records kept in memory
+    are not lost when the games are stopped
+    """
+
+    def __init__(self, path: str, flush_every: int = 1000, max_bytes: int = None, flush_interval: float = 5.0):
+        """
+        :param path: path of the first file. The existing files are appended
+        :param flush_every: number of records kept in memory before they are written
+        :param max_bytes: maximal size of one file, no rotation if None
+        :param flush_interval: maximal number of seconds the records are kept in memory (checked when a record
+        is written), no time limit if None
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.num_records = 0
+
+        self._buffer = []
+        # the last existing file is appended
+        self._index = max(len(HandHistory.files(path)) - 1, 0)
+        self._file = None
+        self._open()
+        self._last_flush = monotonic()
+        atexit.register(self.close)
+
+    @staticmethod
+    def file_name(path: str, index: int) -> str:
+        """Name of the rotated file with the index (0 is the first file)"""
+        return path if index == 0 else f"{path}.{index}"
+
+    def _open(self):
+        self._file = open(HandHistoryWriter.file_name(self.path, self._index), "ab")
+        if self._file.tell() != 0:
+            with open(HandHistoryWriter.file_name(self.path, self._index), "rb") as f:
+                _, version = HandHistory._header.unpack(f.read(HandHistory._header.size))
+            if version != HandHistory.VERSION:
+                # the records of the other version are not appended, the next file is started
+                self._file.close()
+                self._index += 1
+                self._open()
+                return
+
+        if self._file.tell() == 0:
+            self._file.write(HandHistory._header.pack(HandHistory.MAGIC, HandHistory.VERSION))
+            # the file can be read before the first record is written
+            self._file.flush()
+
+    def write(self, record: HandRecord):
+        """Adds the record, it is written to the file with the next flush"""
+        self._buffer.append(HandHistory.encode(record))
+        self.num_records += 1
+        if len(self._buffer) >= self.flush_every or \
+                (self.flush_interval is not None and monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Writes the records kept in memory to the file"""
+        if self._buffer:
+            if self.max_bytes is not None and self._file.tell() > HandHistory._header.size and \
+                    self._file.tell() + sum(map(len, self._buffer)) > self.max_bytes:
+                self._file.close()
+                self._index += 1
+                self._open()
+
+            self._file.write(b"".join(self._buffer))
+            self._buffer.clear()
+        self._file.flush()
+        self._last_flush = monotonic()
+
+    def close(self):
+        """Writes the rest of the records and closes the file"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+            atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class HandHistoryRecorder(GameObserver):
+    """
+    Collects the hands of the game from its events and writes them with HandHistoryWriter
+    (see the hand_history argument of Game). The recorder reads the cards of all the players from the game,
+    so it is only meant for the trusted tables
+    """
+
+    def __init__(self, game, writer: HandHistoryWriter):
+        """
+        :param game: the recorded game
+        :param writer: writer of the records
+        """
+        self.game = game
+        self.writer = writer
+        self._start = None
+        self._actions = []
+        self._num_shown = 0
+
+    def on_event(self, event):
+        event_type = type(event)
+        table = self.game.table
+
+        if event_type is Action:
+            flags = (HandHistory.FOLD if event.fold else 0) | (HandHistory.ALL_IN if event.all_in else 0)
+            self._actions.append((event.round_idx, event.seat, event.amount, flags))
+
+        elif event_type is BlindPosted:
+            flags = HandHistory.BLIND | (HandHistory.ALL_IN if table.status[event.seat] & TableState.ALL_IN else 0)
+            self._actions.append((1, event.seat, event.amount, flags))
+
+        elif event_type is StreetDealt:
+            self._num_shown += len(event.cards)
+
+        elif event_type is GameStarted:
+            self._start = (
+                event.game_idx, event.dealer_idx, tuple(table.money),
+                tuple((cards[0].id, cards[1].id) for cards in table.cards),
+                tuple(card.id for card in self.game.community_cards), self.game.hand_seed
+            )
+            self._actions = []
+            self._num_shown = 0
+
+        elif event_type is GameEnded:
+            game_idx, dealer_idx, money, hole_cards, board, seed = self._start
+            self.writer.write(HandRecord(
+                game_idx, dealer_idx, self.game.small_blind, board, self._num_shown, money, hole_cards,
+                tuple(self._actions), event.gains, seed
+            ))
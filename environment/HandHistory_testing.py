@@ -0,0 +1,76 @@
+import sys
+from os.path import getsize, join
+from tempfile import TemporaryDirectory
+
+from poker.environment.BatchGame_testing import ScriptedPlayer
+from poker.environment.Game import Game
+from poker.environment.HandHistory import HandHistory, HandHistoryWriter
+from poker.environment.HandReplay import HandReplay
+
+"""
+Round trip of the hand history: the games are recorded by HandHistoryWriter into the rotated files, read back by
+HandHistory.read() and played again by HandReplay, which must give the recorded gains of every hand
+"""
+
+
+def record_tables(path: str, num_tables: int, num_games: int, max_bytes: int) -> tuple:
+    """
+    Plays the tables of 2 to 6 scripted players, the even tables with a seed, the odd ones without
+    :return: number of the played hands and the money of every table in the end
+    """
+    num_hands = 0
+    tables_money = []
+    with HandHistoryWriter(path, flush_every=50, max_bytes=max_bytes) as writer:
+        for table in range(num_tables):
+            num_seats = 2 + table % 5
+            seed = table if table % 2 == 0 else None
+            game = Game([ScriptedPlayer(table, seat) for seat in range(num_seats)], 200, 5, hand_history=writer,
+                        seed=seed)
+            while game.count_active_players() > 1 and game.game_idx < num_games:
+                game.play_game()
+                num_hands += 1
+            tables_money.append(list(game.table.money))
+
+    return num_hands, tables_money
+
+
+if __name__ == '__main__':
+    num_tables = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+
+    with TemporaryDirectory() as directory:
+        path = join(directory, "hands.bin")
+        max_bytes = 8192
+        num_hands, tables_money = record_tables(path, num_tables, 30, max_bytes)
+        records = list(HandHistory.read(path))
+        files = HandHistory.files(path)
+
+        # TEST 1 EVERY PLAYED HAND IS READ BACK IN ORDER FROM THE ROTATED FILES
+        print(f"{num_hands} hands played, {len(records)} read from {len(files)} files")
+        assert len(records) == num_hands
+        assert len(files) > 1 and all(getsize(file_path) <= max_bytes for file_path in files)
+        new_tables = [k for k, record in enumerate(records) if record.game_idx == 0]
+        assert len(new_tables) == num_tables
+        assert all(records[k].game_idx + 1 == records[k + 1].game_idx
+                   for k in range(len(records) - 1) if k + 1 not in new_tables)
+
+        # TEST 2 THE SEEDS ARE RECORDED FOR THE TABLES WITH A SEED ONLY
+        table_records = [records[start:end] for start, end in zip(new_tables, new_tables[1:] + [len(records)])]
+        assert all((record.seed is not None) == (table % 2 == 0)
+                   for table, table_hands in enumerate(table_records) for record in table_hands)
+
+        # TEST 3 EVERY HAND IS REPLAYED WITH THE RECORDED GAINS (HandReplay.play() CHECKS THEM)
+        for record in records:
+            HandReplay.replay(record)
+        final_money = [[money + gain for money, gain in zip(table_hands[-1].money, table_hands[-1].gains)]
+                       for table_hands in table_records]
+        print(f"{len(records)} hands replayed")
+        assert final_money == tables_money
+
+        # TEST 4 THE REPLAYED HANDS ARE RECORDED THE SAME WAY AS THE ORIGINAL ONES
+        replay_path = join(directory, "replay.bin")
+        with HandHistoryWriter(replay_path) as writer:
+            for record in records:
+                HandReplay.replay(record, hand_history=writer)
+        assert list(HandHistory.read(replay_path)) == records
+
+    print("ALL TESTS PASSED")
@@ -0,0 +1,261 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from math import comb
+from random import sample
+
+import numpy as np
+
+from .HandEvaluator import HandEvaluator
+
+
+class HandRankTable:
+    """
+    Precomputed ranks of all C(52, 7) = 133784560 sets of 7 cards, stored in a file and memory mapped read-only. \n
+    Every set of card ids c0 < c1 < ... < c6 is indexed by its combinatorial number C(c0, 1) + C(c1, 2) + ... + C(c6, 7),
+    which is a perfect hash from 0 to C(52, 7) - 1. The table stores the class of every set: the index of its rank among
+    all 4824 distinct ranks of 7 cards (uint16, so the file is about 268 MB). Since the classes are sorted,
+    comparing classes is the same as comparing ranks. \n
+    The file is only mapped, never read into the process memory, so all the processes on the machine
+    (e.g. workers of training and comparison runs) share the same pages through the OS page cache. \n
+    File format (little endian): header (magic, version, number of classes, number of hands),
+    ranks of the classes (uint32 each), classes of the hands (uint16 each).
+    Generate and check the file with: python -m poker.environment.HandRankTable build|verify
+    """
+    MAGIC = b"PKHR"
+    VERSION = 1
+    NUM_CARDS = 7
+    NUM_HANDS = comb(52, NUM_CARDS)
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_ranks.bin")
+    # environment variable to use the file from another location
+    PATH_ENV = "POKER_HAND_RANKS"
+
+    _header = struct.Struct("<4sIIQ4x")
+
+    # _binomial[k][n] = C(n, k)
+    _binomial = [[comb(n, k) for n in range(53)] for k in range(NUM_CARDS + 1)]
+    _np_binomial = np.array(_binomial, dtype=np.int64)
+
+    # shared instance, loaded on the first use
+    _table = None
+    _table_checked = False
+
+    def __init__(self, path: str):
+        """
+        Maps the file of the table
+        :param path: path to the file generated by build()
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, num_classes, num_hands = HandRankTable._header.unpack_from(self._mmap, 0)
+        if magic != HandRankTable.MAGIC or version != HandRankTable.VERSION or num_hands != HandRankTable.NUM_HANDS:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a hand rank table of version {HandRankTable.VERSION}")
+
+        classes_offset = HandRankTable._header.size
+        data_offset = classes_offset + 4 * num_classes
+        if len(self._mmap) != data_offset + 2 * num_hands:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+
+        self.path = path
+        self.class_ranks = np.frombuffer(self._mmap, dtype="<u4", count=num_classes, offset=classes_offset)
+        self._class_ranks_list = self.class_ranks.tolist()
+
+        # zero copy views of the classes: numpy array for the batches and memoryview for the single hands
+        self.classes = np.frombuffer(self._mmap, dtype="<u2", count=num_hands, offset=data_offset)
+        self._classes_view = memoryview(self._mmap)[data_offset:].cast("H")
+
+    @staticmethod
+    def get():
+        """
+        :return: the shared table if its file exists, None otherwise. The file is only looked up once
+        """
+        if not HandRankTable._table_checked:
+            HandRankTable._table_checked = True
+            path = os.environ.get(HandRankTable.PATH_ENV, HandRankTable.DEFAULT_PATH)
+            if os.path.exists(path):
+                HandRankTable._table = HandRankTable(path)
+
+        return HandRankTable._table
+
+    @staticmethod
+    def index(card_ids) -> int:
+        """
+        :param card_ids: 7 different card ids
+        :return: index of the set of the cards in the table
+        """
+        binomial = HandRankTable._binomial
+        idx = 0
+        for k, card_id in enumerate(sorted(card_ids), 1):
+            idx += binomial[k][card_id]
+        return idx
+
+    @staticmethod
+    def index_batch(card_ids: np.ndarray) -> np.ndarray:
+        """
+        Vectorized index()
+        :param card_ids: integer array of shape (N, 7)
+        :return: int64 array of shape (N,)
+        """
+        card_ids = np.sort(np.asarray(card_ids, dtype=np.int64), axis=1)
+        return HandRankTable._np_binomial[np.arange(1, HandRankTable.NUM_CARDS + 1), card_ids].sum(axis=1)
+
+    def lookup(self, card_ids) -> int:
+        """
+        :param card_ids: 7 different card ids
+        :return: the same rank as HandEvaluator.evaluate() returns
+        """
+        return self._class_ranks_list[self._classes_view[HandRankTable.index(card_ids)]]
+
+    def lookup_batch(self, card_ids: np.ndarray) -> np.ndarray:
+        """
+        :param card_ids: integer array of shape (N, 7)
+        :return: int64 array of shape (N,) of the same ranks as HandEvaluator.evaluate_batch() returns
+        """
+        return self.class_ranks[self.classes[HandRankTable.index_batch(card_ids)]].astype(np.int64)
+
+    @staticmethod
+    def _colex_combinations(n: int, k: int) -> np.ndarray:
+        """
+        :return: all k-combinations of range(n) in colexicographic order (the order of their indexes),
+        array of shape (C(n, k), k). The combinations of range(m) for m < n are its prefix
+        """
+        combinations = np.arange(n, dtype=np.int8)[:, None]
+        for size in range(2, k + 1):
+            blocks = []
+            for top in range(size - 1, n):
+                prefix = combinations[:comb(top, size - 1)]
+                blocks.append(np.hstack((prefix, np.full((len(prefix), 1), top, dtype=np.int8))))
+            combinations = np.concatenate(blocks)
+        return combinations
+
+    @staticmethod
+    def _class_ranks() -> np.ndarray:
+        """
+        :return: sorted array of all distinct ranks of 7 cards
+        """
+        # without a flush: every multiset of 7 ranks (at most 4 of each). Suits are assigned round robin
+        # over the sorted ranks, so equal ranks get different suits and no suit is used more than twice
+        rank_multisets = []
+
+        def fill(rank: int, left: int, current: list):
+            if left == 0:
+                rank_multisets.append(list(current))
+                return
+            if rank == 13:
+                return
+            for cnt in range(min(4, left), -1, -1):
+                fill(rank + 1, left - cnt, current + [rank] * cnt)
+
+        fill(0, HandRankTable.NUM_CARDS, [])
+        ranks = np.array(rank_multisets, dtype=np.int64)
+        card_ids = ranks + 13 * (np.arange(HandRankTable.NUM_CARDS) % 4)
+        non_flush = HandEvaluator.evaluate_batch(card_ids)
+
+        # with a flush: any 5, 6 or 7 cards of one suit can be completed by cards that don't make a stronger hand
+        flush = np.array(HandEvaluator._flush, dtype=np.int64)
+        return np.unique(np.concatenate((non_flush, flush[flush != 0])))
+
+    @staticmethod
+    def build(path: str = DEFAULT_PATH, verbose: bool = True):
+        """
+        Generates the table file. The file is written next to the path first and then moved in place
+        :param path: where to save the table
+        :param verbose: print progress
+        """
+        class_ranks = HandRankTable._class_ranks().astype("<u4")
+        data_offset = HandRankTable._header.size + 4 * len(class_ranks)
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(HandRankTable._header.pack(
+                HandRankTable.MAGIC, HandRankTable.VERSION, len(class_ranks), HandRankTable.NUM_HANDS
+            ))
+            f.write(class_ranks.tobytes())
+            f.truncate(data_offset + 2 * HandRankTable.NUM_HANDS)
+
+        classes = np.memmap(tmp_path, dtype="<u2", mode="r+", offset=data_offset, shape=(HandRankTable.NUM_HANDS,))
+
+        # For the two highest cards c5 < c6 the sets c0 < ... < c4 < c5 are the first C(c5, 5) 5-combinations
+        # in colexicographic order and their indexes are the contiguous range starting at C(c5, 6) + C(c6, 7)
+        combinations = HandRankTable._colex_combinations(50, 5)
+        masks = HandEvaluator.masks_from_ids(combinations)
+        chunk = 1 << 19
+
+        for c6 in range(6, 52):
+            for c5 in range(5, c6):
+                start = comb(c6, 7) + comb(c5, 6)
+                high_mask = (1 << c5) | (1 << c6)
+                num = comb(c5, 5)
+                for i in range(0, num, chunk):
+                    j = min(num, i + chunk)
+                    ranks = HandEvaluator.evaluate_mask_batch(masks[i:j] | high_mask)
+                    classes[start + i: start + j] = np.searchsorted(class_ranks, ranks)
+            if verbose:
+                print(f"Generated {comb(c6 + 1, 7)} hands out of {HandRankTable.NUM_HANDS}")
+
+        classes.flush()
+        del classes
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def verify(path: str = DEFAULT_PATH, num_samples: int = 1000000, full: bool = False) -> bool:
+        """
+        Checks the table file against HandEvaluator
+        :param path: path to the table
+        :param num_samples: number of random hands to check
+        :param full: check every hand of the table
+        :return: True if the table is correct
+        """
+        table = HandRankTable(path)
+
+        if not np.all(np.diff(table.class_ranks.astype(np.int64)) > 0):
+            return False
+
+        rng = np.random.default_rng()
+        card_ids = np.argsort(rng.random((num_samples, 52)), axis=1)[:, :HandRankTable.NUM_CARDS]
+        if not np.array_equal(table.lookup_batch(card_ids), HandEvaluator.evaluate_batch(card_ids)):
+            return False
+
+        for _ in range(100):
+            card_ids = sample(range(52), HandRankTable.NUM_CARDS)
+            mask = 0
+            for card_id in card_ids:
+                mask |= 1 << card_id
+            if table.lookup(card_ids) != HandEvaluator.evaluate(mask):
+                return False
+
+        if full:
+            combinations = HandRankTable._colex_combinations(50, 5)
+            masks = HandEvaluator.masks_from_ids(combinations)
+            for c6 in range(6, 52):
+                for c5 in range(5, c6):
+                    start = comb(c6, 7) + comb(c5, 6)
+                    num = comb(c5, 5)
+                    ranks = HandEvaluator.evaluate_mask_batch(masks[:num] | (1 << c5) | (1 << c6))
+                    if not np.array_equal(table.class_ranks[table.classes[start: start + num]], ranks):
+                        return False
+
+        return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate or verify the memory mapped 7 card hand rank table")
+    parser.add_argument("command", choices=["build", "verify"])
+    parser.add_argument("--path", default=os.environ.get(HandRankTable.PATH_ENV, HandRankTable.DEFAULT_PATH))
+    parser.add_argument("--samples", type=int, default=1000000, help="number of random hands to verify")
+    parser.add_argument("--full", action="store_true", help="verify every hand of the table")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        HandRankTable.build(args.path)
+        print(f"Saved to {args.path}")
+    else:
+        correct = HandRankTable.verify(args.path, args.samples, args.full)
+        print("Table is correct" if correct else "Table is INCORRECT")
+        sys.exit(0 if correct else 1)
@@ -0,0 +1,127 @@
+import sys
+from time import perf_counter
+
+from .Card import Card
+from .Game import Game
+from .HandHistory import HandHistory, HandRecord
+from poker.Players.PlayerBase import PlayerBase
+
+
+class ReplayPlayer(PlayerBase):
+    """
+    Player that makes the recorded bets of its seat instead of asking an agent
+    """
+
+    def __init__(self, replay: "HandReplay", seat: int):
+        super().__init__()
+        self.replay = replay
+        self.seat = seat
+
+    def needs_broadcast(self):
+        return False
+
+    def action(self):
+        return self.replay.next_bet(self.seat)
+
+
+class ReplayGame(Game):
+    """
+    Game that deals the cards of the recorded hand: from its seed if it has one, otherwise the recorded cards
+    """
+
+    def __init__(self, record: HandRecord, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.record = record
+
+    def give_cards(self):
+        record = self.record
+        card_ids = list(record.board) + [card_id for hole_cards in record.hole_cards for card_id in hole_cards]
+
+        if record.seed is None:
+            drawn_cards = [Card.from_id(card_id) for card_id in card_ids]
+        else:
+            self.hand_seed = record.seed
+            drawn_cards = Game.draw_cards(record.seed, self.num_players)
+            if [card.id for card in drawn_cards] != card_ids:
+                raise ValueError(f"The cards of the seed {record.seed} are not the recorded cards")
+
+        self.deal_cards(drawn_cards)
+
+
+class HandReplay:
+    """
+    Plays the recorded hand (see HandHistory) again: the same seats, money, dealer and cards, and the recorded bets
+    instead of the agents. The game can be profiled or benchmarked on the fixed hands this way
+    """
+
+    def __init__(self, record: HandRecord, **game_kwargs):
+        """
+        :param record: the recorded hand
+        :param game_kwargs: other arguments of Game (e.g. hand_history)
+        """
+        self.record = record
+        # the blinds are posted by the game itself
+        self._actions = [action for action in record.actions if not action[3] & HandHistory.BLIND]
+        self._next_action = 0
+
+        num_seats = len(record.money)
+        players = [ReplayPlayer(self, seat) for seat in range(num_seats)]
+        self.game = ReplayGame(record, players, 0, record.small_blind, **game_kwargs)
+        self.game.table.money[:] = list(record.money)
+        self.game.dealer_idx = record.dealer_idx
+        self.game.game_idx = record.game_idx
+
+    def next_bet(self, seat: int) -> int:
+        """
+        :return: the next recorded bet, it must be the bet of the seat
+        """
+        if self._next_action == len(self._actions):
+            raise ValueError(f"Game {self.record.game_idx}: seat {seat} acts after the last recorded action")
+
+        round_idx, action_seat, amount, flags = self._actions[self._next_action]
+        if action_seat != seat or round_idx != self.game.round_idx:
+            raise ValueError(f"Game {self.record.game_idx}: seat {seat} acts in round {self.game.round_idx}, "
+                             f"but the recorded action is of seat {action_seat} in round {round_idx}")
+        self._next_action += 1
+
+        return -1 if flags & HandHistory.FOLD else amount
+
+    def play(self) -> tuple:
+        """
+        Plays the hand
+        :return: the gains of the seats, they are checked against the recorded ones
+        """
+        self.game.play_game()
+
+        gains = tuple(money - start_money for money, start_money in zip(self.game.table.money, self.record.money))
+        if self._next_action != len(self._actions):
+            raise ValueError(f"Game {self.record.game_idx}: {len(self._actions) - self._next_action} "
+                             f"recorded actions were not made")
+        if gains != tuple(self.record.gains):
+            raise ValueError(f"Game {self.record.game_idx}: the gains {gains} differ from the recorded "
+                             f"{tuple(self.record.gains)}")
+
+        return gains
+
+    @staticmethod
+    def replay(record: HandRecord, **game_kwargs) -> tuple:
+        """
+        Plays the recorded hand again
+        :return: the gains of the seats
+        """
+        return HandReplay(record, **game_kwargs).play()
+
+
+if __name__ == '__main__':
+    # python -m poker.environment.HandReplay hands.bin [record index] [number of repeats]
+    path = sys.argv[1]
+    records = list(HandHistory.read(path))
+    if len(sys.argv) > 2:
+        records = [records[int(sys.argv[2])]] * (int(sys.argv[3]) if len(sys.argv) > 3 else 1)
+
+    start = perf_counter()
+    for record in records:
+        HandReplay.replay(record)
+    elapsed = perf_counter() - start
+
+    print(f"{len(records)} hands replayed in {elapsed:.2f} s ({len(records) / max(elapsed, 1e-9):.0f} hands/s)")
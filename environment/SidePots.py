@@ -0,0 +1,61 @@
+class SidePots:
+    """
+    Split of the pot in the end of the game (see Game.game_end()). \n
+    The players are ranked once: the players still in the game first, the stronger hands first, then the bigger bets.
+    Every group of equally strong hands still in the game takes from every player ranked after it as much as
+    the last (the smallest) bet of the group, above the level already taken by the stronger groups.
+    The players get back what is left of their bets
+    """
+
+    @staticmethod
+    def order(bets: list, live: list, hand_keys: list) -> list:
+        """
+        :return: the seats in the order of the ranks (the same priority as PlayerProfile.players_profile_comparator,
+        the equal seats stay in the order of the seats)
+        """
+        return sorted(range(len(bets)), key=lambda i: (live[i], hand_keys[i], bets[i]), reverse=True)
+
+    @staticmethod
+    def split(bets: list, live: list, hand_keys: list) -> list:
+        """
+        :param bets: total bets of the seats in the game
+        :param live: True for the seats still in the game (didn't fold and not out of money)
+        :param hand_keys: keys of the hands of the seats (the stronger the hand the greater the key),
+        only the keys of the seats still in the game are used
+        :return: the money every seat gets: the won money and the rest of its bet
+        """
+        num_seats = len(bets)
+        order = SidePots.order(bets, live, hand_keys)
+        returned = [0] * num_seats
+
+        # contribution level already taken from every player ranked after the groups processed so far
+        level = 0
+        i = 0
+        while i < num_seats and live[order[i]]:
+            j = i
+            while j + 1 < num_seats and live[order[j + 1]] and hand_keys[order[j + 1]] == hand_keys[order[i]]:
+                j += 1
+
+            # the layer of the pot taken by the group: the smallest bet among the group above the level
+            get_bet = max(0, bets[order[j]] - level)
+            top = level + get_bet
+            total_gain = 0
+            for k in range(j + 1, num_seats):
+                bet = bets[order[k]]
+                if bet > level:
+                    total_gain += min(bet, top) - level
+
+            m = j - i + 1
+            for k in range(i, j + 1):
+                seat = order[k]
+                # the group members get back their bets above the levels of the stronger groups
+                returned[seat] = total_gain // m + max(0, bets[seat] - level) + (k - i < total_gain % m)
+
+            level = top
+            i = j + 1
+
+        for k in range(i, num_seats):
+            seat = order[k]
+            returned[seat] = max(0, bets[seat] - level)
+
+        return returned
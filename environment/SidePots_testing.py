@@ -0,0 +1,164 @@
+import sys
+from copy import deepcopy
+from functools import cmp_to_key
+from random import Random
+from time import perf_counter
+
+from poker.environment.SidePots import SidePots
+
+"""
+Randomized differential check of SidePots.split() against the loops of Game.game_end() it replaced, which sorted
+the deep copies of the profiles and moved the money between them: 
+
+sorted_profiles_split() - the loop with the hands compared by a single precomputed key, where the players who folded
+or are out of money don't share the pot, the split must be identical
+
+baseline_split() - the original loop of game_end(), the splits may only differ where a player who folded or is out
+of money has the same hand as a player still in the game (the original loop let such a player share the pot)
+
+In both loops the hands are compared by the keys, the ranking of the hands itself is not checked here
+"""
+
+
+class Profile:
+    def __init__(self, id, money, bet, fold, out_of_money):
+        self.id = id
+        self.money = money
+        self.bet = bet
+        self.fold = fold
+        self.out_of_money = out_of_money
+
+
+def sorted_profiles_split(money: list, bets: list, live_flags: list, hand_keys: list,
+                          baseline: bool = False) -> list:
+    """
+    The loop of game_end() before SidePots
+    :param baseline: if True, the original loop: the profiles are sorted by
+    PlayerProfile.players_profile_comparator and the group of the equal hands doesn't stop at the players who folded
+    or are out of money
+    :return: the money of every seat after the game
+    """
+    players_profiles = [
+        Profile(i, money[i], bets[i], fold, out_of_money) for i, (fold, out_of_money) in enumerate(live_flags)
+    ]
+    original = players_profiles
+    players_profiles = deepcopy(players_profiles)
+    if baseline:
+        players_profiles.sort(key=cmp_to_key(baseline_comparator(hand_keys)), reverse=True)
+    else:
+        players_profiles.sort(
+            key=lambda profile: (not (profile.fold or profile.out_of_money), hand_keys[profile.id], profile.bet),
+            reverse=True
+        )
+
+    i = 0
+    while i < len(players_profiles):
+        if players_profiles[i].out_of_money or players_profiles[i].fold:
+            break
+        j = i
+        while j < len(players_profiles) \
+                and (baseline or not (players_profiles[j].out_of_money or players_profiles[j].fold)) \
+                and hand_keys[players_profiles[i].id] == hand_keys[players_profiles[j].id]:
+            j += 1
+
+        j -= 1
+        get_bet = players_profiles[j].bet
+        total_gain = 0
+        m = j - i + 1
+        for k in range(j + 1, len(players_profiles)):
+            total_gain += min(players_profiles[k].bet, get_bet)
+            players_profiles[k].bet = max(0, players_profiles[k].bet - get_bet)
+
+        for k in range(i, j + 1):
+            players_profiles[k].money += total_gain // m
+
+        for k in range(i, i + total_gain % m):
+            players_profiles[k].money += 1
+
+        i = j + 1
+
+    result = [0] * len(original)
+    for profile in players_profiles:
+        result[profile.id] = profile.money + profile.bet
+    return result
+
+
+def baseline_comparator(hand_keys: list):
+    """The original PlayerProfile.players_profile_comparator, with the hands compared by the keys"""
+    def comparator(profile1: Profile, profile2: Profile) -> int:
+        if profile1.fold or profile1.out_of_money:
+            return -1
+        if profile2.fold or profile2.out_of_money:
+            return 1
+
+        dif = hand_keys[profile1.id] - hand_keys[profile2.id]
+        if dif != 0:
+            return dif
+
+        return profile1.bet - profile2.bet
+
+    return comparator
+
+
+def baseline_split(money: list, bets: list, live_flags: list, hand_keys: list) -> list:
+    return sorted_profiles_split(money, bets, live_flags, hand_keys, baseline=True)
+
+
+def has_fold_tie(live_flags: list, hand_keys: list) -> bool:
+    """
+    :return: True if a player who folded or is out of money has the same hand as a player still in the game
+    """
+    live_keys = {hand_keys[i] for i, (fold, out_of_money) in enumerate(live_flags) if not (fold or out_of_money)}
+    return any((fold or out_of_money) and hand_keys[i] in live_keys
+               for i, (fold, out_of_money) in enumerate(live_flags))
+
+
+def random_case(rng: Random):
+    """Table with all-ins of different sizes, folds, players out of money and equal hands"""
+    num_seats = rng.randint(2, 9)
+    money, bets, live_flags, hand_keys = [], [], [], []
+    for _ in range(num_seats):
+        out_of_money = rng.random() < 0.1
+        fold = not out_of_money and rng.random() < 0.3
+        bet = 0 if out_of_money else rng.choice([rng.randint(0, 50), rng.randint(0, 500), rng.choice([10, 20, 100])])
+        money.append(0 if out_of_money else rng.randint(0, 300))
+        bets.append(bet)
+        live_flags.append((fold, out_of_money))
+        # few different keys, so that there are many equal hands
+        hand_keys.append(rng.randint(0, 4) if rng.random() < 0.7 else rng.getrandbits(24))
+    return money, bets, live_flags, hand_keys
+
+
+if __name__ == '__main__':
+    num_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = Random(0)
+    cases = [random_case(rng) for _ in range(num_cases)]
+
+    start = perf_counter()
+    expected = [sorted_profiles_split(*case) for case in cases]
+    sorted_profiles_time = perf_counter() - start
+
+    start = perf_counter()
+    results = []
+    for money, bets, live_flags, hand_keys in cases:
+        live = [not (fold or out_of_money) for fold, out_of_money in live_flags]
+        returned = SidePots.split(bets, live, hand_keys)
+        results.append([money[i] + returned[i] for i in range(len(money))])
+    split_time = perf_counter() - start
+
+    # TEST 1 THE SAME SPLIT AS THE LOOP AFTER USER-005
+    mismatches = [k for k in range(num_cases) if results[k] != expected[k]]
+    for k in mismatches[:5]:
+        print(f"case {cases[k]}: expected {expected[k]}, got {results[k]}")
+    print(f"{num_cases} cases, {len(mismatches)} mismatches. "
+          f"Sorted profiles {sorted_profiles_time:.2f} s, SidePots {split_time:.2f} s")
+
+    # TEST 2 THE BASELINE LOOP ONLY DIFFERS WHERE A PLAYER NOT IN THE GAME HAS THE SAME HAND AS A PLAYER IN THE GAME
+    baseline = [baseline_split(*case) for case in cases]
+    differences = [k for k in range(num_cases) if results[k] != baseline[k]]
+    unexpected = [k for k in differences if not has_fold_tie(cases[k][2], cases[k][3])]
+    for k in unexpected[:5]:
+        print(f"case {cases[k]}: baseline {baseline[k]}, got {results[k]}")
+    print(f"{len(differences)} differences from the baseline, {len(unexpected)} of them without a fold tie")
+
+    print("ALL TESTS PASSED" if not mismatches and not unexpected else "MISMATCHES FOUND")
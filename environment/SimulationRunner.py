@@ -0,0 +1,122 @@
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+import numpy as np
+
+from .Game import Game
+from poker.Players.PlayerBase import PlayerBase
+
+
+class TableResult(namedtuple("TableResult", ["table_idx", "seed", "gains"])):
+    """
+    Result of one table: gains[hand][player] is the money the player (by the index in the list returned by
+    the players factory, not by the seat) earned in the hand
+    """
+    __slots__ = ()
+
+
+# players of the worker process, created once by _init_worker()
+_worker_players = None
+
+
+def _init_worker(players_factory):
+    """Creates the players of the worker process (the agents are loaded once per worker, not per table)"""
+    global _worker_players
+    _worker_players = players_factory()
+
+
+def _play_tables(tables: list, seed: int, hands_per_table: int, start_value: int, small_blind: int,
+                 shuffle_seats: bool) -> list:
+    """
+    Plays the tables with the players of the worker
+    :param tables: indexes of the tables
+    :return: list of TableResult
+    """
+    players = _worker_players
+    n = len(players)
+
+    results = []
+    for table_idx in tables:
+        # every table has its own random numbers, whatever worker plays it. The exact winning probabilities
+        # in the equity cache don't depend on them, the sampled ones (see PlayerBase.cache_sampled) do
+        if PlayerBase.cache_sampled and PlayerBase.equity_cache is not None:
+            PlayerBase.equity_cache.clear()
+        table_seed = np.random.SeedSequence([seed, table_idx]).generate_state(1)[0].item()
+        random.seed(table_seed)
+        np.random.seed(table_seed)
+
+        perm = np.random.permutation(n) if shuffle_seats else np.arange(n)
+        seated_players = [None] * n
+        for j in range(n):
+            seated_players[perm[j]] = players[j]
+
+        game = Game(seated_players, start_value, small_blind, seed=table_seed)
+        gains = []
+        prev_money = [start_value] * n
+        cnt = 0
+        while game.count_active_players() > 1 and cnt < hands_per_table:
+            game.play_game()
+            cnt += 1
+
+            money = [game.table.money[perm[j]] + game.table.bet[perm[j]] for j in range(n)]
+            gains.append([money[j] - prev_money[j] for j in range(n)])
+            prev_money = money
+
+        results.append(TableResult(table_idx, table_seed, gains))
+
+    return results
+
+
+class SimulationRunner:
+    """
+    Plays independent tables in parallel processes (same as the loop of calculate_gain() in the comparison scripts,
+    one core per worker). \n
+    Every worker creates its players once with players_factory, so the factory must be picklable (a function
+    defined at the top level of a module). The random numbers of every table are seeded from (seed, table index),
+    so the results don't depend on the number of workers, as long as the players don't change between
+    the tables (e.g. the learning players do). The equity cache of PlayerBase is kept by the workers, since it only
+    holds the exact probabilities, unless PlayerBase.cache_sampled is set (then it is cleared before every table)
+    """
+
+    def __init__(self, num_workers: int = None, seed: int = 0, chunk_size: int = 10, start_value: int = 1000,
+                 small_blind: int = 10, shuffle_seats: bool = False):
+        """
+        :param num_workers: number of the processes, all the cores if None. 0 plays all the tables in this process
+        :param seed: seed of the random numbers of the tables
+        :param chunk_size: number of the tables a worker plays before sending the results back
+        :param start_value: initial amount of money of every player
+        :param small_blind: small blind
+        :param shuffle_seats: randomly permute the seats of the players at every table
+        """
+        self.num_workers = cpu_count() if num_workers is None else num_workers
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.start_value = start_value
+        self.small_blind = small_blind
+        self.shuffle_seats = shuffle_seats
+
+    def run(self, players_factory, n_tables: int, hands_per_table: int):
+        """
+        Plays n_tables tables with up to hands_per_table games each
+        :param players_factory: function without arguments that returns the list of the players
+        :param n_tables: number of the tables
+        :param hands_per_table: maximal number of games played at one table
+        :return: iterator of TableResult in the order of the tables, the results are yielded as soon as
+        their chunk is played
+        """
+        chunks = [list(range(i, min(i + self.chunk_size, n_tables))) for i in range(0, n_tables, self.chunk_size)]
+        args = (self.seed, hands_per_table, self.start_value, self.small_blind, self.shuffle_seats)
+
+        if self.num_workers == 0:
+            _init_worker(players_factory)
+            for chunk in chunks:
+                yield from _play_tables(chunk, *args)
+            return
+
+        with ProcessPoolExecutor(self.num_workers, initializer=_init_worker, initargs=(players_factory,)) as executor:
+            futures = [executor.submit(_play_tables, chunk, *args) for chunk in chunks]
+            for future in futures:
+                yield from future.result()
+
@@ -0,0 +1,40 @@
+class SuitIsomorphism:
+    """
+    Canonical forms of the spots up to the permutation of suits. \n
+    Spots that only differ by the names of suits (e.g. A♥K♥ on Q♥J♥2♠ and A♠K♠ on Q♠J♠2♦) have the same winning
+    probability, so they get the same canonical form. The cards are given as masks (see Card.to_mask()), where every
+    suit occupies its own 13 bits. The suits are reordered by the (hole cards, community cards) ranks they hold,
+    which is the same for all the permutations of one spot and differs for the spots that are not isomorphic
+    """
+    SUIT_MASK = 0x1FFF
+
+    @staticmethod
+    def canonicalize(hole_mask: int, board_mask: int) -> tuple:
+        """
+        :param hole_mask: mask of the player's cards
+        :param board_mask: mask of the community cards
+        :return: hole mask and board mask with the suits renamed to the canonical order
+        """
+        suit_mask = SuitIsomorphism.SUIT_MASK
+        suits = sorted(
+            (((hole_mask >> shift) & suit_mask, (board_mask >> shift) & suit_mask) for shift in (0, 13, 26, 39)),
+            reverse=True
+        )
+
+        canonical_hole = 0
+        canonical_board = 0
+        for shift, (hole, board) in zip((0, 13, 26, 39), suits):
+            canonical_hole |= hole << shift
+            canonical_board |= board << shift
+
+        return canonical_hole, canonical_board
+
+    @staticmethod
+    def canonical_key(hole_mask: int, board_mask: int, num_opponents: int) -> tuple:
+        """
+        :param hole_mask: mask of the player's cards
+        :param board_mask: mask of the community cards
+        :param num_opponents: number of the opponents still in the game
+        :return: hashable key that is equal for all the suit isomorphic spots
+        """
+        return SuitIsomorphism.canonicalize(hole_mask, board_mask) + (num_opponents,)
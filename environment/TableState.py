@@ -0,0 +1,187 @@
+from poker.Players.PlayerProfile import PlayerProfile
+
+
+class TableState:
+    """
+    State of the players at the table stored by seats in parallel lists: money, bet, current round bet, cards
+    and status bit flags. The numbers of the players still in the game (not folded and not out of money) and
+    of the players that can raise (also not all-in) are kept up to date on every change of the status,
+    so they are never recounted. \n
+    SeatView gives the same interface as PlayerProfile for one seat, so the game can still keep the profiles
+    in Game.players_profiles
+    """
+    __slots__ = ("num_seats", "ids", "money", "bet", "round_bet", "cards", "status",
+                 "num_active", "num_can_raise", "views")
+
+    # status bit flags
+    FOLD = 1
+    OUT_OF_MONEY = 2
+    ALL_IN = 4
+    SHOWED_CARDS = 8
+
+    # players with any of these flags are not in the game
+    NOT_ACTIVE = FOLD | OUT_OF_MONEY
+    # players with any of these flags can't raise
+    CANT_RAISE = FOLD | OUT_OF_MONEY | ALL_IN
+
+    def __init__(self, ids: list, start_value: int):
+        """
+        :param ids: ids of the players by seats
+        :param start_value: initial amount of money of every player
+        """
+        self.num_seats = len(ids)
+        self.ids = list(ids)
+        self.money = [start_value] * self.num_seats
+        self.bet = [0] * self.num_seats
+        self.round_bet = [0] * self.num_seats
+        self.cards = [[] for _ in range(self.num_seats)]
+        self.status = [0] * self.num_seats
+
+        self.num_active = self.num_seats
+        self.num_can_raise = self.num_seats
+
+        self.views = [SeatView(self, seat) for seat in range(self.num_seats)]
+
+    def set_flag(self, seat: int, flag: int, value: bool):
+        """
+        Sets or clears the status flag of the seat and updates the counters
+        :param seat: seat of the player
+        :param flag: one of the status flags
+        :param value: True to set the flag, False to clear it
+        """
+        old_status = self.status[seat]
+        status = old_status | flag if value else old_status & ~flag
+        if status == old_status:
+            return
+
+        self.status[seat] = status
+        self.num_active += (not status & TableState.NOT_ACTIVE) - (not old_status & TableState.NOT_ACTIVE)
+        self.num_can_raise += (not status & TableState.CANT_RAISE) - (not old_status & TableState.CANT_RAISE)
+
+    def next_active_seat(self, seat: int) -> int:
+        """
+        :return: the next seat after the given one with the player still in the game
+        """
+        status = self.status
+        seat = (seat + 1) % self.num_seats
+        while status[seat] & TableState.NOT_ACTIVE:
+            seat = (seat + 1) % self.num_seats
+        return seat
+
+    def snapshot(self) -> tuple:
+        """
+        :return: the values of all the seats and the counters as tuples (see restore())
+        """
+        return (
+            tuple(self.money), tuple(self.bet), tuple(self.round_bet), tuple(tuple(cards) for cards in self.cards),
+            tuple(self.status), self.num_active, self.num_can_raise
+        )
+
+    def restore(self, state: tuple):
+        """
+        Sets the values of all the seats back to the snapshot. The lists are changed in place, so the views stay valid
+        :param state: value returned by snapshot()
+        """
+        money, bet, round_bet, cards, status, self.num_active, self.num_can_raise = state
+        self.money[:] = money
+        self.bet[:] = bet
+        self.round_bet[:] = round_bet
+        self.cards[:] = [list(seat_cards) for seat_cards in cards]
+        self.status[:] = status
+
+    def reset_seat(self, seat: int):
+        """Resets the seat after the game has finished (same as PlayerProfile.reset())"""
+        out_of_money = self.money[seat] == 0 or self.status[seat] & TableState.OUT_OF_MONEY
+        self.bet[seat] = 0
+        self.round_bet[seat] = 0
+
+        old_status = self.status[seat]
+        status = TableState.OUT_OF_MONEY if out_of_money else 0
+        self.status[seat] = status
+        self.num_active += (not status & TableState.NOT_ACTIVE) - (not old_status & TableState.NOT_ACTIVE)
+        self.num_can_raise += (not status & TableState.CANT_RAISE) - (not old_status & TableState.CANT_RAISE)
+
+
+def _status_property(flag: int, doc: str):
+    """Property of SeatView for the status flag"""
+    def getter(self):
+        return bool(self._table.status[self._seat] & flag)
+
+    def setter(self, value):
+        self._table.set_flag(self._seat, flag, value)
+
+    return property(getter, setter, doc=doc)
+
+
+def _list_property(name: str, doc: str):
+    """Property of SeatView for the value of the seat in the list of TableState"""
+    def getter(self):
+        return getattr(self._table, name)[self._seat]
+
+    def setter(self, value):
+        getattr(self._table, name)[self._seat] = value
+
+    return property(getter, setter, doc=doc)
+
+
+class SeatView:
+    """
+    View of one seat of TableState with the same attributes as PlayerProfile. Reading and writing the attributes
+    reads and writes the lists of the table
+    """
+    __slots__ = ("_table", "_seat")
+
+    # names of all the values of the profile
+    FIELDS = PlayerProfile.FIELDS
+
+    def __init__(self, table: TableState, seat: int):
+        self._table = table
+        self._seat = seat
+
+    money = _list_property("money", "Amount of money left")
+    cards = _list_property("cards", "Cards of the player")
+    id = property(lambda self: self._table.ids[self._seat], doc="Id of the player")
+    bet = _list_property("bet", "Total amount of money that was bet during all rounds in one game")
+    current_round_bet = _list_property("round_bet", "Amount of money already bet in the current round")
+
+    out_of_money = _status_property(TableState.OUT_OF_MONEY, "True if is out of money (can't play anymore)")
+    fold = _status_property(TableState.FOLD, "True if the player folded yet")
+    showed_cards = _status_property(TableState.SHOWED_CARDS, "True if the player showed the cards")
+    all_in = _status_property(TableState.ALL_IN, "True if the player played all-in")
+
+    @property
+    def seat(self) -> int:
+        return self._seat
+
+    def reset(self):
+        """Resets the players profile after the game has finished"""
+        self._table.reset_seat(self._seat)
+
+    def get_cards(self):
+        return list(self.cards)
+
+    def profile_values(self) -> dict:
+        """
+        :return: all the values of the seat by the names of PlayerProfile.FIELDS
+        """
+        table = self._table
+        seat = self._seat
+        status = table.status[seat]
+        return {
+            "money": table.money[seat],
+            "cards": table.cards[seat],
+            "id": table.ids[seat],
+            "out_of_money": bool(status & TableState.OUT_OF_MONEY),
+            "fold": bool(status & TableState.FOLD),
+            "showed_cards": bool(status & TableState.SHOWED_CARDS),
+            "all_in": bool(status & TableState.ALL_IN),
+            "current_round_bet": table.round_bet[seat],
+            "bet": table.bet[seat],
+        }
+
+    def __str__(self):
+        s = ""
+        for key in SeatView.FIELDS:
+            s += f"\t{key}: {getattr(self, key)}\n"
+
+        return s